@@ -1,22 +1,322 @@
-from flask import Flask, request, jsonify
+import copy
+import cProfile
+import hashlib
+import os
+import re
+import tempfile
+import time
+import uuid
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+import numpy as np
 import pandas as pd
 from utils.carregador_dados import CarregadorDados
 from utils.visualizadorr import VisualizadorDados
+from utils.registro_datasets import RegistroDatasets
+from utils.cache_colunar import CacheColunar
+from utils.cache_resultados import CacheResultados
+from utils.estatisticas import MotorEstatisticas
+from utils.correlacoes import MotorCorrelacoes
+from utils.registro_modelos import RegistroModelos
+from utils.armazem_modelos import ArmazemModelos
+from utils.codificador_categorico import CodificadorCategorico
+from utils.coletor_predicoes import ColetorPredicoes
+from utils.fila_treinamento import (
+    FilaTreinamento, executar_treinamento, executar_treinamento_streaming, executar_busca
+)
 from utils.modelos_ml import GerenciadorModelosML
+from utils.importacao_tardia import preaquecer_modulos
+from utils.serializacao_json import ProvedorJSONRapido, QuadroJSON
+from utils.instrumentacao import (
+    AmostradorPilhas, MetricasPrometheus, fase, iniciar_medicao, encerrar_medicao
+)
 
 MODEL_MAP = {
     'random_forest': 'Random Forest',
     'decision_tree': 'Decision Tree',
     'knn': 'K-Nearest Neighbors',
-    'logistic_regression': 'Logistic Regression'
+    'logistic_regression': 'Logistic Regression',
+    'sgd_logistic_regression': 'SGD Logistic Regression',
+    'naive_bayes': 'Naive Bayes'
 }
 
+CHART_FORMATS = ('json', 'html')
+EVALUATION_MODES = ('holdout', 'cv')
+
+PREVIEW_ROWS = 100
+MAX_PAGE_SIZE = 5000
+PREDICT_OUTPUT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+PREDICT_CHUNK_ROWS = int(os.environ.get('PREDICT_CHUNK_ROWS', 50_000))
+PREDICT_CHUNK_ROWS_MAX = 1_000_000
+MODEL_STORE_MMAP = os.environ.get('MODEL_STORE_MMAP', '1') != '0'
+TUNING_JOBS = int(os.environ.get('TUNING_JOBS', -1))
+STREAMING_THRESHOLD_BYTES = int(os.environ.get('STREAMING_THRESHOLD_MB', 512)) * 1024**2
+STREAMING_CHUNK_ROWS = int(os.environ.get('STREAMING_CHUNK_ROWS', 100_000))
+STREAMING_SAMPLE_ROWS = int(os.environ.get('STREAMING_SAMPLE_ROWS', 10_000))
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+PROFILE_FORMAT = os.environ.get('PROFILE_FORMAT', 'pstats')
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 0))
+TRAIN_UPLOAD_DIR = os.environ.get('TRAIN_UPLOAD_DIR', tempfile.gettempdir())
+STREAM_TRAIN_CHUNK_ROWS = int(os.environ.get('STREAM_TRAIN_CHUNK_ROWS', 100_000))
+CORRELATION_MAX_COLUMNS = int(os.environ.get('CORRELATION_MAX_COLUMNS', 30))
+CORRELATION_MAX_PAIRS = 1000
+
+
+class ProvedorJSONMedido(ProvedorJSONRapido):
+    # Conta a (de)serialização JSON de todas as rotas nas fases da requisição
+    def dumps_bytes(self, obj, pretty=False):
+        with fase('serialize'):
+            return super().dumps_bytes(obj, pretty)
+
+    def loads(self, s, **kwargs):
+        with fase('parse'):
+            return super().loads(s, **kwargs)
+
+
 app = Flask(__name__)
+app.json = ProvedorJSONMedido(app)
 CORS(app)
+metricas = MetricasPrometheus()
+
+
+def profiling_requested():
+    if not PROFILE_DIR:
+        return False
+    return request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+
+
+@app.before_request
+def start_request_timing():
+    g.medidor, g.medicao_token = iniciar_medicao()
+    if profiling_requested():
+        if PROFILE_FORMAT == 'collapsed':
+            g.profiler = AmostradorPilhas().start()
+        else:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+
+def dump_profile(profiler, endpoint):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = re.sub(r'[^A-Za-z0-9]+', '_', endpoint).strip('_') or 'root'
+    if isinstance(profiler, AmostradorPilhas):
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, f'{name}-{time.time_ns()}.folded')
+        profiler.dump(path)
+    else:
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, f'{name}-{time.time_ns()}.prof')
+        profiler.dump_stats(path)
+    return path
+
+
+@app.after_request
+def finish_request_timing(response):
+    medidor = g.get('medidor')
+    if medidor is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile-File'] = os.path.basename(dump_profile(profiler, endpoint))
+    
+    total = medidor.elapsed()
+    response.headers['Server-Timing'] = medidor.server_timing(total)
+    metricas.observe(endpoint, request.method, response.status_code, total, medidor.phases,
+                     response.calculate_content_length() or 0)
+    if SLOW_REQUEST_MS and total * 1000 >= SLOW_REQUEST_MS:
+        dataset_id = (request.get_json(silent=True) or {}).get('dataset_id') if request.is_json else None
+        print(f'Requisição lenta: {request.method} {endpoint} {total * 1000:.0f}ms '
+              f'dataset={dataset_id} fases={medidor.server_timing(total)}')
+    return response
+
+
+@app.teardown_request
+def reset_request_timing(exc):
+    token = g.pop('medicao_token', None)
+    if token is not None:
+        encerrar_medicao(token)
+
+cache_colunar = CacheColunar(
+    os.environ.get('COLUMNAR_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache', 'datasets')),
+    max_bytes=int(os.environ.get('COLUMNAR_CACHE_MAX_MB', 5120)) * 1024**2
+)
+registro_modelos = RegistroModelos(max_models=int(os.environ.get('MODEL_REGISTRY_MAX_ITEMS', 32)))
+
+
+MODEL_METRIC_KEYS = ('accuracy', 'precision', 'recall', 'f1_score', 'train_accuracy', 'training_time')
+
+
+def register_trained_model(result):
+    gerenciador_ml, payload = result
+    if gerenciador_ml is not None:
+        metrics = payload.get('metrics', payload)
+        metadata = {'metrics': {k: metrics[k] for k in MODEL_METRIC_KEYS if k in metrics}}
+        if 'best_params' in payload:
+            metadata['params'] = payload['best_params']
+        payload['model_id'] = registro_modelos.register(gerenciador_ml, metadata=metadata)
+    return payload
+
+
+armazem_modelos = ArmazemModelos(
+    os.environ.get('MODEL_STORE_DIR', os.path.join(os.path.dirname(__file__), 'modelos_salvos'))
+)
+
+
+def load_stored_model(name, version=None):
+    gerenciador_ml, metadata = armazem_modelos.load(name, version, mmap=MODEL_STORE_MMAP)
+    if gerenciador_ml is None:
+        return None, None
+    # Id estável por versão: recarregar a mesma versão substitui a entrada no registro
+    model_id = f"{metadata['name']}-v{metadata['version']}"
+    registro_modelos.register(gerenciador_ml, model_id=model_id, metadata=metadata)
+    return model_id, metadata
+
+
+def preload_default_model():
+    default_model = os.environ.get('DEFAULT_MODEL')
+    if not default_model:
+        return
+    name, _, version = default_model.partition(':')
+    try:
+        model_id, _ = load_stored_model(name, version.lstrip('v') or None)
+    except (OSError, ValueError) as e:
+        print(f'Erro ao pré-carregar modelo {default_model}: {str(e)}')
+        return
+    if model_id is None:
+        print(f'Modelo padrão não encontrado: {default_model}')
+    else:
+        print(f'Modelo padrão pré-carregado: {model_id}')
+
+
+fila_treinamento = FilaTreinamento(
+    max_workers=int(os.environ.get('TRAINING_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    on_complete=register_trained_model
+)
+
+coletor_predicoes = ColetorPredicoes(
+    max_wait_ms=float(os.environ.get('PREDICT_BATCH_WAIT_MS', 2)),
+    max_batch_size=int(os.environ.get('PREDICT_MAX_BATCH', 256))
+)
+
+registro_datasets = RegistroDatasets(
+    max_datasets=int(os.environ.get('DATASET_REGISTRY_MAX_ITEMS', 8)),
+    max_bytes=int(os.environ.get('DATASET_REGISTRY_MAX_MB', 2048)) * 1024**2
+)
+
+cache_resultados = CacheResultados(
+    max_bytes=int(os.environ.get('RESULT_CACHE_MAX_MB', 256)) * 1024**2
+)
+
+
+def dataframe_payload(df, orient='records'):
+    # Serializado direto das colunas pelo provedor JSON (NaN vira null sem passar por object)
+    return QuadroJSON(df, orient)
+
+
+def request_orient(source):
+    orient = source.get('orient', 'records')
+    if orient not in QuadroJSON.ORIENTS:
+        return None, (jsonify({'error': f'orient deve ser um de {QuadroJSON.ORIENTS}'}), 400)
+    return orient, None
+
+
+def persist_dataset(dataset_id, df, profile=None):
+    # Cache colunar com o perfil ao lado: o id sobrevive à expulsão do registro e a reinícios
+    if profile is not None and profile.sample is not None:
+        # A amostra é o próprio DataFrame gravado; volta a ser ligada ao recarregar
+        profile = copy.copy(profile)
+        profile.sample, profile._sample_keys = None, None
+    with fase('persist'):
+        cache_colunar.put(dataset_id, df, extra={'profile': profile} if profile is not None else None)
+
+
+def lookup_dataset(dataset_id):
+    df = registro_datasets.get(dataset_id)
+    if df is None:
+        # Expulso do registro ou servidor reiniciado: o cache colunar em disco guarda o mesmo id
+        with fase('dataframe'):
+            df = cache_colunar.get(dataset_id)
+        if df is not None:
+            profile = (cache_colunar.get_extra(dataset_id) or {}).get('profile')
+            if profile is not None and profile.sample_size:
+                profile.sample = df
+            registro_datasets.put(dataset_id, df, profile)
+    return df
+
+
+def request_aggregate(source):
+    # 'auto' ou booleano; strings como "false"/"0" não podem virar True por bool()
+    value = source.get('aggregate', 'auto')
+    if isinstance(value, str):
+        value = value.strip().lower()
+        value = {'true': True, '1': True, 'false': False, '0': False}.get(value, value)
+    if value == 'auto' or isinstance(value, bool):
+        return value, None
+    return None, (jsonify({'error': "aggregate deve ser 'auto', true ou false"}), 400)
+
+
+def dataframe_from_request(payload, convert_dtypes=True):
+    dataset_id = payload.get('dataset_id')
+    if dataset_id:
+        df = lookup_dataset(dataset_id)
+        if df is None:
+            return None, (jsonify({'error': 'Dataset não encontrado'}), 404)
+        return df, None
+
+    data = payload.get('data')
+    if not data:
+        return None, (jsonify({'error': 'Dados não fornecidos'}), 400)
+    with fase('dataframe'):
+        df = pd.DataFrame(data)
+        if convert_dtypes:
+            df = df.convert_dtypes()
+    return df, None
+
+
+def dataset_fingerprint(payload, df):
+    if payload.get('dataset_id'):
+        return payload['dataset_id']
+    # Calculado uma vez por requisição, mesmo que várias chaves de cache usem o mesmo DataFrame
+    if 'dataset_fingerprint' not in g:
+        with fase('hash'):
+            g.dataset_fingerprint = CacheResultados.fingerprint_dataframe(df)
+    return g.dataset_fingerprint
+
+
+def result_cache_key(namespace, payload, df, params):
+    return CacheResultados.make_key(namespace, dataset_fingerprint(payload, df), params)
+
+
+def correlation_matrix(payload, df, method='pearson'):
+    # A matriz fica no cache de resultados por dataset; top-k e subconjuntos são recortes baratos dela
+    cache_key = result_cache_key('correlation-matrix', payload, df, {'method': method})
+    correlation = cache_resultados.get(cache_key)
+    if correlation is None:
+        with fase('correlation'):
+            motor = MotorCorrelacoes(method)
+            columns = motor.numeric_columns(df)
+            correlation = (columns, motor.matrix(df, columns))
+        cache_resultados.put(cache_key, correlation, correlation[1].nbytes)
+    return correlation
+
+
+def cached_response(cache_key):
+    body = cache_resultados.get(cache_key)
+    if body is None:
+        return None
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+def cache_json_response(cache_key, payload):
+    body = app.json.dumps_bytes(payload)
+    cache_resultados.put(cache_key, body, len(body))
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['X-Cache'] = 'MISS'
+    return response
 
-carregador_dados = CarregadorDados()
-gerenciador_ml = GerenciadorModelosML()
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
@@ -30,21 +330,49 @@ def upload_file():
             return jsonify({'error': 'Arquivo vazio'}), 400
         
         print(f'Lendo arquivo: {file.filename}')
+        carregador_dados = CarregadorDados(cache=cache_colunar)
         
-        df = carregador_dados.load_csv(file)
+        preview_rows = min(request.form.get('preview_rows', PREVIEW_ROWS, type=int), MAX_PAGE_SIZE)
+        mode = request.form.get('mode', 'auto')
+        optimize = request.form.get('optimize', 'true').lower() not in ('0', 'false', 'no')
+        orient, error = request_orient(request.form)
+        if error:
+            return error
+        append_to = request.form.get('append_to')
+        if append_to:
+            return append_dataset(append_to, carregador_dados, file, preview_rows, orient)
+        if mode == 'auto':
+            file.stream.seek(0, os.SEEK_END)
+            mode = 'stream' if file.stream.tell() > STREAMING_THRESHOLD_BYTES else 'full'
+            file.stream.seek(0)
+        if mode == 'stream':
+            return upload_streaming(carregador_dados, file.stream, preview_rows, orient)
+
+        with fase('hash'):
+            dataset_id = registro_datasets.fingerprint(file.stream)
+        if not optimize:
+            dataset_id = f'{dataset_id}-raw'
+        df = registro_datasets.get(dataset_id)
+        if df is None:
+            with fase('parse'):
+                df = carregador_dados.load_csv(file, cache_key=dataset_id, optimize=optimize)
+            registro_datasets.put(dataset_id, df)
+        else:
+            carregador_dados.data = df
         print(f'Dados carregados: {df.shape[0]} linhas, {df.shape[1]} colunas')
         
-        data_info = carregador_dados.get_data_info()
-        column_types = carregador_dados.get_column_types()
+        with fase('profile'):
+            data_info = carregador_dados.get_data_info()
+            column_types = carregador_dados.get_column_types()
         
         if data_info and 'dtypes' in data_info:
             data_info['dtypes'] = {k: str(v) for k, v in data_info['dtypes'].items()}
         
-        # Converter NaN para None para JSON válido
-        df = df.astype(object).where(pd.notna(df), None)
-        
         return jsonify({
-            'data': df.to_dict('records'),
+            'dataset_id': dataset_id,
+            'mode': 'full',
+            'orient': orient,
+            'preview': dataframe_payload(df.head(preview_rows), orient),
             'columns': df.columns.tolist(),
             'shape': df.shape,
             'info': data_info,
@@ -53,35 +381,211 @@ def upload_file():
     except Exception as e:
         print(f'Erro no upload: {str(e)}')
         return jsonify({'error': str(e)}), 500
+
+
+def upload_streaming(carregador_dados, stream, preview_rows, orient='records'):
+    # Lê o CSV em blocos: só o perfil agregado e uma amostra limitada ficam em memória
+    profile, file_hash = carregador_dados.load_csv_streaming(
+        stream, chunksize=STREAMING_CHUNK_ROWS, sample_size=STREAMING_SAMPLE_ROWS
+    )
+    sample = carregador_dados.data
+    dataset_id = f'{file_hash}-sample'
+    # O perfil acompanha a amostra: contagens e momentos continuam valendo para o arquivo inteiro
+    registro_datasets.put(dataset_id, sample, profile)
+    persist_dataset(dataset_id, sample, profile)
+    print(f'Dados processados em blocos: {profile.n_rows} linhas, {len(profile.columns)} colunas')
+    
+    return jsonify({
+        'dataset_id': dataset_id,
+        'mode': 'stream',
+        'orient': orient,
+        'preview': dataframe_payload(sample.head(preview_rows), orient),
+        'columns': list(profile.columns),
+        'shape': [profile.n_rows, len(profile.columns)],
+        'info': carregador_dados.get_data_info(),
+        'column_types': carregador_dados.get_column_types(),
+        'profile': profile.to_dict()
+    })
+
+
+def append_dataset(dataset_id, carregador_dados, file, preview_rows, orient='records'):
+    # Versões são endereçadas por conteúdo: o resultado ganha um id novo e o dataset original continua válido
+    df = lookup_dataset(dataset_id)
+    if df is None:
+        return jsonify({'error': 'Dataset não encontrado'}), 404
+    if dataset_id.endswith('-sample'):
+        return jsonify({'error': 'Não é possível acrescentar linhas a uma amostra'}), 400
+    
+    with fase('hash'):
+        delta_hash = registro_datasets.fingerprint(file.stream)
+    new_id = hashlib.sha256(f'{dataset_id}+{delta_hash}'.encode()).hexdigest()[:32]
+    combined = lookup_dataset(new_id)
+    if combined is not None:
+        carregador_dados.data = combined
+        carregador_dados.profile = registro_datasets.profile(new_id)
+        appended_rows = len(combined) - len(df)
+    else:
+        carregador_dados.data = df
+        # O perfil é copiado para que o dataset original continue com o seu
+        profile = registro_datasets.profile(dataset_id)
+        try:
+            with fase('append'):
+                combined, appended_rows = carregador_dados.append_csv(
+                    file, profile=copy.deepcopy(profile) if profile is not None else None,
+                    base_size=registro_datasets.size(dataset_id)
+                )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        registro_datasets.put(new_id, combined, carregador_dados.profile, size=combined.attrs['memory_usage'])
+        persist_dataset(new_id, combined, carregador_dados.profile)
+    print(f'Linhas acrescentadas: {appended_rows} (total: {len(combined)})')
+    
+    with fase('profile'):
+        data_info = carregador_dados.get_data_info()
+        column_types = carregador_dados.get_column_types()
+    data_info['dtypes'] = {k: str(v) for k, v in data_info['dtypes'].items()}
+    
+    return jsonify({
+        'dataset_id': new_id,
+        'parent_id': dataset_id,
+        'mode': 'append',
+        'appended_rows': appended_rows,
+        'orient': orient,
+        'preview': dataframe_payload(combined.iloc[len(combined) - appended_rows:].head(preview_rows), orient),
+        'columns': combined.columns.tolist(),
+        'shape': combined.shape,
+        'info': data_info,
+        'column_types': column_types
+    })
+
+
+@app.route('/api/datasets/<dataset_id>/append', methods=['POST'])
+def append_rows(dataset_id):
+    try:
+        if 'file' not in request.files or request.files['file'].filename == '':
+            return jsonify({'error': 'Nenhum arquivo enviado'}), 400
+        preview_rows = min(request.form.get('preview_rows', PREVIEW_ROWS, type=int), MAX_PAGE_SIZE)
+        orient, error = request_orient(request.form)
+        if error:
+            return error
+        return append_dataset(dataset_id, CarregadorDados(), request.files['file'], preview_rows, orient)
+    except Exception as e:
+        print(f'Erro no append: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/datasets/<dataset_id>/rows', methods=['GET'])
+def dataset_rows(dataset_id):
+    df = lookup_dataset(dataset_id)
+    if df is None:
+        return jsonify({'error': 'Dataset não encontrado'}), 404
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', PREVIEW_ROWS, type=int), 0), MAX_PAGE_SIZE)
+    orient, error = request_orient(request.args)
+    if error:
+        return error
+    
+    result = {
+        'dataset_id': dataset_id,
+        'offset': offset,
+        'limit': limit,
+        'total_rows': len(df),
+        'orient': orient,
+        'rows': dataframe_payload(df.iloc[offset:offset + limit], orient)
+    }
+    profile = registro_datasets.profile(dataset_id)
+    if profile is not None and profile.sample_size is not None:
+        # Só a amostra pode ser paginada; total_rows é o do arquivo inteiro
+        result['total_rows'] = profile.n_rows
+        result['sample_rows'] = len(df)
+        result['sample'] = True
+    return jsonify(result)
+
+
+@app.route('/api/datasets/<dataset_id>', methods=['DELETE'])
+def delete_dataset(dataset_id):
+    removed = registro_datasets.remove(dataset_id)
+    removed = cache_colunar.remove(dataset_id) or removed
+    cache_resultados.invalidate(dataset_id)
+    if not removed:
+        return jsonify({'error': 'Dataset não encontrado'}), 404
+    return jsonify({'deleted': dataset_id})
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        'results': cache_resultados.stats(),
+        'datasets': registro_datasets.stats(),
+        'columnar': cache_colunar.stats()
+    })
+
+
+@app.route('/api/cache', methods=['DELETE'])
+def clear_cache():
+    return jsonify({'cleared': cache_resultados.invalidate()})
     
 
     
 
+def profile_statistics(motor, profile, df):
+    # Agregações incrementais saem do perfil; só as demais (mediana, quantis, distintos) leem as linhas
+    incremental = [agg for agg in motor.aggregates if agg in profile.AGGREGATES]
+    remaining = [agg for agg in motor.aggregates if agg not in profile.AGGREGATES]
+    from_profile = profile.statistics(incremental) if incremental else {}
+    from_rows = MotorEstatisticas(remaining, motor.quantiles).compute(df) if remaining else {}
+    columns = list(dict.fromkeys([*from_rows, *from_profile]))
+    stats = {}
+    for col in columns:
+        values = {**from_rows.get(col, {}), **from_profile.get(col, {})}
+        stats[col] = {agg: values.get(agg) for agg in motor.aggregates}
+    null_counts = {col: profile.null_counts.get(col, 0) for col in df.columns}
+    return stats, null_counts
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_data():
     try:
-        data = request.json.get('data')
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
+        df, error = dataframe_from_request(request.json, convert_dtypes=False)
+        if error:
+            return error
         
-        df = pd.DataFrame(data)
+        try:
+            motor = MotorEstatisticas(
+                aggregates=request.json.get('aggregates'),
+                quantiles=request.json.get('quantiles', (0.25, 0.5, 0.75))
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
         
-        stats = {}
-        for col in df.select_dtypes(include=['number']).columns:
-            stats[col] = {
-                'mean': float(df[col].mean()),
-                'median': float(df[col].median()),
-                'std': float(df[col].std()),
-                'min': float(df[col].min()),
-                'max': float(df[col].max())
-            }
+        cache_key = result_cache_key('analyze', request.json, df, {
+            'aggregates': motor.aggregates, 'quantiles': motor.quantiles
+        })
+        cached = cached_response(cache_key)
+        if cached is not None:
+            return cached
         
-        return jsonify({
-            'total_rows': len(df),
+        profile = registro_datasets.profile(request.json.get('dataset_id'))
+        with fase('statistics'):
+            if profile is not None:
+                stats, null_counts = profile_statistics(motor, profile, df)
+            else:
+                stats = motor.compute(df)
+                null_counts = motor.null_counts(df)
+        
+        result = {
+            'total_rows': profile.n_rows if profile is not None else len(df),
             'total_columns': len(df.columns),
-            'null_values': int(df.isnull().sum().sum()),
+            'null_values': sum(null_counts.values()),
+            'null_counts': null_counts,
             'statistics': stats
-        })
+        }
+        if profile is not None and profile.sample_size is not None:
+            # Upload em blocos: só a amostra está em memória, então o que não vem do perfil é estimado nela
+            result['sample_rows'] = len(df)
+            result['sample_based'] = [agg for agg in motor.aggregates if agg not in profile.AGGREGATES]
+        return cache_json_response(cache_key, result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
@@ -92,39 +596,57 @@ def analyze_data():
 @app.route('/api/visualize', methods=['POST'])
 def visualize_data():
     try:
-        data = request.json.get('data')
-        if not data:
-            return jsonify({'error': 'Dados não fornecidos'}), 400
+        df, error = dataframe_from_request(request.json)
+        if error:
+            return error
+        
+        chart_format = request.json.get('chart_format', 'json')
+        binary = bool(request.json.get('binary', False))
+        if chart_format not in CHART_FORMATS:
+            return jsonify({'error': 'Formato de gráfico não suportado'}), 400
+        aggregate, error = request_aggregate(request.json)
+        if error:
+            return error
         
-        df = pd.DataFrame(data).convert_dtypes()
-        visualizador = VisualizadorDados(df)
+        cache_key = result_cache_key('visualize', request.json, df, {
+            'chart_format': chart_format, 'binary': binary, 'aggregate': aggregate
+        })
+        cached = cached_response(cache_key)
+        if cached is not None:
+            return cached
         
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'string']).columns.tolist()
+        with fase('figure'):
+            visualizador = VisualizadorDados(df, aggregate=aggregate,
+                                             profile=registro_datasets.profile(request.json.get('dataset_id')))
         
-        charts = {}
+            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
         
-        if len(numeric_cols) > 0:
-            dist_fig = visualizador.plot_distribution(numeric_cols[0])
-            charts['distribution'] = dist_fig.to_html(full_html=False)
+            charts = {}
         
-        if len(numeric_cols) > 1:
-            corr_fig = visualizador.plot_correlation_heatmap()
-            charts['correlation'] = corr_fig.to_html(full_html=False)
+            if len(numeric_cols) > 0:
+                dist_fig = visualizador.plot_distribution(numeric_cols[0])
+                charts['distribution'] = VisualizadorDados.figure_to_payload(dist_fig, chart_format, binary)
         
-        if len(categorical_cols) > 0:
-            pie_fig = visualizador.plot_pie_chart(categorical_cols[0])
-            charts['pie'] = pie_fig.to_html(full_html=False)
+            if len(numeric_cols) > 1:
+                corr_fig = visualizador.plot_correlation_heatmap(
+                    correlation=correlation_matrix(request.json, df), max_columns=CORRELATION_MAX_COLUMNS
+                )
+                charts['correlation'] = VisualizadorDados.figure_to_payload(corr_fig, chart_format, binary)
         
-        if 'Country' in df.columns or 'country' in df.columns:
-            location_col = 'Country' if 'Country' in df.columns else 'country'
-            try:
-                geo_fig = visualizador.plot_geographic_map(location_col)
-                charts['geographic'] = geo_fig.to_html(full_html=False)
-            except:
-                pass  
+            if len(categorical_cols) > 0:
+                pie_fig = visualizador.plot_pie_chart(categorical_cols[0])
+                charts['pie'] = VisualizadorDados.figure_to_payload(pie_fig, chart_format, binary)
+        
+            if 'Country' in df.columns or 'country' in df.columns:
+                location_col = 'Country' if 'Country' in df.columns else 'country'
+                try:
+                    geo_fig = visualizador.plot_geographic_map(location_col)
+                    charts['geographic'] = VisualizadorDados.figure_to_payload(geo_fig, chart_format, binary)
+                except:
+                    pass  
         
-        return jsonify(charts)
+        return cache_json_response(cache_key, charts)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
@@ -132,18 +654,87 @@ def visualize_data():
 
 
 
+@app.route('/api/correlations', methods=['POST'])
+def correlations():
+    try:
+        df, error = dataframe_from_request(request.json)
+        if error:
+            return error
+        
+        method = request.json.get('method', 'pearson')
+        top_k = min(max(int(request.json.get('top_k', 20)), 0), CORRELATION_MAX_PAIRS)
+        max_columns = max(int(request.json.get('max_columns', CORRELATION_MAX_COLUMNS)), 2)
+        categorical = bool(request.json.get('categorical', True))
+        chart = bool(request.json.get('chart', False))
+        chart_format = request.json.get('chart_format', 'json')
+        binary = bool(request.json.get('binary', False))
+        if method not in MotorCorrelacoes.METHODS:
+            return jsonify({'error': 'Método de correlação não suportado'}), 400
+        if chart_format not in CHART_FORMATS:
+            return jsonify({'error': 'Formato de gráfico não suportado'}), 400
+        
+        cache_key = result_cache_key('correlations', request.json, df, {
+            'method': method, 'top_k': top_k, 'max_columns': max_columns, 'categorical': categorical,
+            'chart': chart, 'chart_format': chart_format, 'binary': binary
+        })
+        cached = cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        columns, corr = correlation_matrix(request.json, df, method)
+        shown, subset = MotorCorrelacoes.clustered_subset(corr, columns, max_columns)
+        result = {
+            'method': method,
+            'numeric_columns': len(columns),
+            'pairs': MotorCorrelacoes.top_pairs(corr, columns, top_k, method),
+            'subset': {'columns': shown, 'matrix': np.round(subset.astype(np.float64), 6)}
+        }
+        if categorical:
+            with fase('correlation'):
+                associations = MotorCorrelacoes().associations(df, numeric_columns=columns)
+            associations.sort(key=lambda pair: -pair['value'])
+            result['associations'] = associations[:top_k]
+        if chart and len(columns) > 1:
+            with fase('figure'):
+                fig = VisualizadorDados(df).plot_correlation_heatmap(correlation=(columns, corr), max_columns=max_columns)
+                result['chart'] = VisualizadorDados.figure_to_payload(fig, chart_format, binary)
+        
+        return cache_json_response(cache_key, result)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/train', methods=['POST'])
 def train_model():
     try:
-        data = request.json.get('data')
         model_type = request.json.get('model_type')
         target_column = request.json.get('target_column')
         test_size = request.json.get('test_size', 0.2)
+        chart_format = request.json.get('chart_format', 'json')
+        binary = bool(request.json.get('binary', False))
+        evaluation = request.json.get('evaluation', 'holdout')
+        cv_folds = int(request.json.get('cv_folds', 5))
+        stratified = bool(request.json.get('stratified', True))
+        n_jobs = int(request.json.get('n_jobs', TUNING_JOBS))
+        encoding = request.json.get('encoding', 'ordinal')
         
-        if not data or not model_type or not target_column:
+        if not model_type or not target_column:
             return jsonify({'error': 'Dados incompletos'}), 400
+        if encoding not in CodificadorCategorico.STRATEGIES:
+            return jsonify({'error': 'Codificação não suportada'}), 400
+        if chart_format not in CHART_FORMATS:
+            return jsonify({'error': 'Formato de gráfico não suportado'}), 400
+        if evaluation not in EVALUATION_MODES:
+            return jsonify({'error': 'Modo de avaliação não suportado'}), 400
+        if evaluation == 'cv' and cv_folds < 2:
+            return jsonify({'error': 'São necessários pelo menos 2 folds'}), 400
+        
+        df, error = dataframe_from_request(request.json)
+        if error:
+            return error
         
-        df = pd.DataFrame(data).convert_dtypes()
         model_key = MODEL_MAP.get(model_type)
         if not model_key:
             return jsonify({'error': 'Modelo não suportado'}), 400
@@ -151,50 +742,13 @@ def train_model():
         if target_column not in df.columns:
             return jsonify({'error': 'Coluna alvo não encontrada'}), 400
         
-        X = df.drop(columns=[target_column])
-        y = df[target_column].fillna('Missing')
-
-        gerenciador_ml.prepare_data(X, y, test_size=test_size)
-        gerenciador_ml.train_model(model_key)
-        metrics = gerenciador_ml.evaluate_model()
-
-        import plotly.graph_objects as go
-        import plotly.express as px
-        
-        cm = metrics['confusion_matrix']
-        fig_cm = px.imshow(cm, 
-                          text_auto=True,
-                          labels=dict(x="Predito", y="Real", color="Quantidade"),
-                          title="Matriz de Confusão",
-                          color_continuous_scale='Blues')
-        fig_cm.update_layout(template='plotly_white', height=500)
-        
-        feature_importance_html = None
-        importance_df = gerenciador_ml.get_feature_importance()
-        if importance_df is not None:
-            top_features = importance_df.head(15)
-            fig_importance = px.bar(top_features, 
-                                   x='importance', 
-                                   y='feature',
-                                   orientation='h',
-                                   title='Top 15 - Importância das Features',
-                                   labels={'importance': 'Importância', 'feature': 'Feature'})
-            fig_importance.update_layout(template='plotly_white', height=500)
-            feature_importance_html = fig_importance.to_html(full_html=False)
-
-        response_payload = {
-            'accuracy': metrics['accuracy'],
-            'precision': metrics['precision'],
-            'recall': metrics['recall'],
-            'f1_score': metrics['f1_score'],
-            'train_accuracy': metrics['train_accuracy'],
-            'confusion_matrix': metrics['confusion_matrix'],
-            'classification_report': metrics['classification_report'],
-            'confusion_matrix_plot': fig_cm.to_html(full_html=False),
-            'feature_importance_plot': feature_importance_html
-        }
-
-        return jsonify(response_payload)
+        job_args = (df, model_key, target_column, test_size, request.json.get('params'), chart_format, binary,
+                    evaluation, cv_folds, stratified, n_jobs, encoding)
+        if request.json.get('wait', False):
+            return jsonify(register_trained_model(executar_treinamento(*job_args)))
+        
+        job_id = fila_treinamento.submit(executar_treinamento, *job_args)
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
@@ -202,22 +756,320 @@ def train_model():
 
 
 
-@app.route('/api/predict', methods=['POST'])
-def predict():
+@app.route('/api/train/stream', methods=['POST'])
+def train_model_streaming():
+    # Treino fora da memória: o arquivo vai para o disco e o job o lê em blocos
+    try:
+        if 'file' not in request.files or request.files['file'].filename == '':
+            return jsonify({'error': 'Nenhum arquivo enviado'}), 400
+        
+        model_type = request.form.get('model_type')
+        target_column = request.form.get('target_column')
+        file_format = request.form.get('file_format', 'csv')
+        test_size = request.form.get('test_size', 0.2, type=float)
+        chart_format = request.form.get('chart_format', 'json')
+        binary = request.form.get('binary', 'false').lower() in ('1', 'true', 'yes')
+        chunk_rows = request.form.get('chunk_rows', STREAM_TRAIN_CHUNK_ROWS, type=int)
+        epochs = request.form.get('epochs', 1, type=int)
+        max_holdout_rows = request.form.get('max_holdout_rows', 50_000, type=int)
+        encoding = request.form.get('encoding', 'ordinal')
+        params = app.json.loads(request.form['params']) if request.form.get('params') else None
+        
+        if not model_type or not target_column:
+            return jsonify({'error': 'Dados incompletos'}), 400
+        model_key = MODEL_MAP.get(model_type)
+        if model_key not in GerenciadorModelosML.INCREMENTAL_MODELS:
+            return jsonify({'error': 'Modelo não suporta treino incremental',
+                            'supported': [k for k, v in MODEL_MAP.items()
+                                          if v in GerenciadorModelosML.INCREMENTAL_MODELS]}), 400
+        if file_format not in ('csv', 'arrow'):
+            return jsonify({'error': 'Formato de arquivo não suportado'}), 400
+        if encoding not in CodificadorCategorico.STRATEGIES:
+            return jsonify({'error': 'Codificação não suportada'}), 400
+        if chart_format not in CHART_FORMATS:
+            return jsonify({'error': 'Formato de gráfico não suportado'}), 400
+        if chunk_rows < 1 or epochs < 1 or max_holdout_rows < 1 or not 0 < test_size < 1:
+            return jsonify({'error': 'Parâmetros de treino inválidos'}), 400
+        
+        path = os.path.join(TRAIN_UPLOAD_DIR, f'treino-{uuid.uuid4().hex}.{file_format}')
+        request.files['file'].save(path)
+        job_args = (path, model_key, target_column, file_format, test_size, params, chart_format, binary,
+                    chunk_rows, epochs, max_holdout_rows, encoding)
+        if request.form.get('wait', 'false').lower() in ('1', 'true', 'yes'):
+            try:
+                return jsonify(register_trained_model(executar_treinamento_streaming(*job_args)))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        job_id = fila_treinamento.submit(executar_treinamento_streaming, *job_args, temp_files=[path])
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/tune', methods=['POST'])
+def tune_model():
     try:
-        data = request.json.get('data')
         model_type = request.json.get('model_type')
+        target_column = request.json.get('target_column')
+        test_size = request.json.get('test_size', 0.2)
+        strategy = request.json.get('strategy', 'random')
+        n_trials = int(request.json.get('n_trials', 20))
+        n_jobs = int(request.json.get('n_jobs', TUNING_JOBS))
+        refit = bool(request.json.get('refit', True))
+        encoding = request.json.get('encoding', 'ordinal')
         
-        if not data or not model_type:
+        if not model_type or not target_column:
             return jsonify({'error': 'Dados incompletos'}), 400
+        if encoding not in CodificadorCategorico.STRATEGIES:
+            return jsonify({'error': 'Codificação não suportada'}), 400
+        if strategy not in ('grid', 'random', 'halving'):
+            return jsonify({'error': 'Estratégia de busca não suportada'}), 400
         
-        df = pd.DataFrame(data).convert_dtypes()
+        df, error = dataframe_from_request(request.json)
+        if error:
+            return error
+        
+        model_key = MODEL_MAP.get(model_type)
+        if not model_key:
+            return jsonify({'error': 'Modelo não suportado'}), 400
+        
+        if target_column not in df.columns:
+            return jsonify({'error': 'Coluna alvo não encontrada'}), 400
+        
+        job_args = (df, model_key, target_column, test_size, strategy, n_trials, n_jobs, refit, encoding)
+        if request.json.get('wait', False):
+            return jsonify(register_trained_model(executar_busca(*job_args)))
+        
+        job_id = fila_treinamento.submit(executar_busca, *job_args)
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({'jobs': fila_treinamento.list()})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = fila_treinamento.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    if fila_treinamento.status(job_id, include_result=False) is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    return jsonify({'job_id': job_id, 'cancelled': fila_treinamento.cancel(job_id)})
+
+
+@app.route('/api/trained-models', methods=['GET'])
+def list_trained_models():
+    return jsonify({'models': registro_modelos.list()})
+
+
+@app.route('/api/models', methods=['GET'])
+def list_stored_models():
+    return jsonify({'models': armazem_modelos.list()})
+
+
+@app.route('/api/models', methods=['POST'])
+def save_stored_model():
+    try:
+        model_id = request.json.get('model_id')
+        gerenciador_ml = registro_modelos.get(model_id) if model_id else None
+        if gerenciador_ml is None:
+            return jsonify({'error': 'Modelo não encontrado'}), 404
+        
+        name = request.json.get('name') or gerenciador_ml.model_name.lower().replace(' ', '_')
+        metadata = registro_modelos.metadata(model_id) or {}
+        metadata.pop('name', None)
+        metadata.pop('version', None)
+        metadata['source_model_id'] = model_id
+        # compiled_only: guarda só as árvores compiladas, para servidores que apenas fazem predição
+        compiled_only = bool(request.json.get('compiled_only', False))
+        return jsonify(armazem_modelos.save(name, gerenciador_ml, metadata, compiled_only=compiled_only)), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/models/<name>/load', methods=['POST'])
+def load_model_endpoint(name):
+    try:
+        version = (request.get_json(silent=True) or {}).get('version')
+        model_id, metadata = load_stored_model(name, version)
+        if model_id is None:
+            return jsonify({'error': 'Modelo não encontrado'}), 404
+        return jsonify({'model_id': model_id, **metadata})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/models/<name>', methods=['DELETE'])
+def delete_stored_model(name):
+    try:
+        version = request.args.get('version')
+        if not armazem_modelos.delete(name, version):
+            return jsonify({'error': 'Modelo não encontrado'}), 404
+        return jsonify({'deleted': name, 'version': version})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+def model_from_request(payload):
+    model_id = payload.get('model_id')
+    model_type = payload.get('model_type')
+    if not model_id and not model_type:
+        return None, None, (jsonify({'error': 'Dados incompletos'}), 400)
+    if model_id:
+        gerenciador_ml = registro_modelos.get(model_id)
+        if gerenciador_ml is None:
+            return None, None, (jsonify({'error': 'Modelo não encontrado'}), 404)
+    else:
+        model_key = MODEL_MAP.get(model_type)
+        if not model_key:
+            # latest(None) aceitaria qualquer modelo
+            return None, None, (jsonify({'error': 'Modelo não suportado'}), 400)
+        model_id, gerenciador_ml = registro_modelos.latest(model_key)
+        if gerenciador_ml is None:
+            return None, None, (jsonify({'error': 'Nenhum modelo treinado'}), 400)
+    return model_id, gerenciador_ml, None
+
+
+def single_record(payload):
+    if payload.get('dataset_id'):
+        return None
+    record = payload.get('record')
+    if record is None:
+        data = payload.get('data')
+        record = data[0] if isinstance(data, list) and len(data) == 1 else None
+    return record if isinstance(record, dict) and record else None
+
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    try:
+        model_id, gerenciador_ml, error = model_from_request(request.json)
+        if error:
+            return error
+        
+        record = single_record(request.json)
+        if record is not None:
+            # Pedidos de uma linha passam pelo coletor, que os agrupa em micro-lotes sem pandas
+            prediction = coletor_predicoes.predict(gerenciador_ml, record)
+            if hasattr(prediction, 'item'):
+                prediction = prediction.item()
+            return jsonify({'model_id': model_id, 'predictions': [prediction]})
+        
+        df, error = dataframe_from_request(request.json)
+        if error:
+            return error
         
         predictions = gerenciador_ml.predict(df)
         
-        return jsonify({'predictions': predictions.tolist()})
+        return jsonify({'model_id': model_id, 'predictions': predictions.tolist()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    cache = cache_resultados.stats()
+    datasets = registro_datasets.stats()
+    batching = coletor_predicoes.stats()
+    jobs = fila_treinamento.list()
+    gauges = {
+        'result_cache_items': ('Respostas em cache', cache['items']),
+        'result_cache_bytes': ('Bytes no cache de respostas', cache['total_bytes']),
+        'result_cache_hits': ('Acertos do cache de respostas', cache['hits']),
+        'result_cache_misses': ('Faltas do cache de respostas', cache['misses']),
+        'dataset_registry_items': ('Datasets em memória', datasets['datasets']),
+        'dataset_registry_bytes': ('Bytes dos datasets em memória', datasets['total_bytes']),
+        'trained_models': ('Modelos no registro', len(registro_modelos.list())),
+        'training_jobs_running': ('Jobs de treino em andamento', sum(job['status'] in ('queued', 'running') for job in jobs)),
+        'predict_batches': ('Micro-lotes de predição executados', batching['batches']),
+        'predict_batched_requests': ('Predições atendidas pelo coletor', batching['requests'])
+    }
+    return Response(metricas.render(gauges), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/predict/stats', methods=['GET'])
+def predict_stats():
+    return jsonify(coletor_predicoes.stats())
+
+
+def format_predictions(chunk, predictions, start, output_format, include_columns, header):
+    out = chunk[include_columns].reset_index(drop=True) if include_columns else pd.DataFrame()
+    out.insert(0, 'row', np.arange(start, start + len(chunk)))
+    out['prediction'] = predictions
+    if output_format == 'csv':
+        return out.to_csv(index=False, header=header)
+    return out.to_json(orient='records', lines=True, date_format='iso')
+
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    try:
+        model_id, gerenciador_ml, error = model_from_request(request.form)
+        if error:
+            return error
+        if 'file' not in request.files:
+            return jsonify({'error': 'Nenhum arquivo enviado'}), 400
+        
+        file = request.files['file']
+        input_format = request.form.get('input_format') or (
+            'arrow' if file.filename.lower().endswith(('.arrow', '.feather', '.ipc')) else 'csv'
+        )
+        output_format = request.form.get('output_format', 'ndjson')
+        chunk_rows = min(int(request.form.get('chunk_rows', PREDICT_CHUNK_ROWS)), PREDICT_CHUNK_ROWS_MAX)
+        include_columns = [c for c in request.form.get('include_columns', '').split(',') if c]
+        if output_format not in PREDICT_OUTPUT_FORMATS:
+            return jsonify({'error': 'Formato de saída não suportado'}), 400
+        if chunk_rows < 1:
+            return jsonify({'error': 'chunk_rows deve ser positivo'}), 400
+        
+        chunks = CarregadorDados.iter_chunks(file.stream, input_format, chunk_rows)
+        # O primeiro bloco é pontuado antes de responder para que erros de entrada virem 400
+        first = next(chunks, None)
+        if first is None:
+            return jsonify({'error': 'Arquivo vazio'}), 400
+        missing = [c for c in include_columns if c not in first.columns]
+        if missing:
+            return jsonify({'error': f"Colunas não encontradas: {', '.join(missing)}"}), 400
+        try:
+            first_output = format_predictions(
+                first, gerenciador_ml.predict(first), 0, output_format, include_columns, True
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def generate():
+            yield first_output
+            start = len(first)
+            for chunk in chunks:
+                yield format_predictions(
+                    chunk, gerenciador_ml.predict(chunk), start, output_format, include_columns, False
+                )
+                start += len(chunk)
+        
+        response = Response(stream_with_context(generate()), mimetype=PREDICT_OUTPUT_FORMATS[output_format])
+        response.headers['X-Model-Id'] = model_id
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+preload_default_model()
+if os.environ.get('PREWARM_IMPORTS', '0') != '0':
+    preaquecer_modulos()
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,303 @@
+"""Benchmark dos endpoints do backend via test client do Flask.
+
+1. Execute: python benchmark.py --sizes 1000,100000
+2. Compare com uma execução anterior: python benchmark.py --sizes 1000,100000 --compare resultados_antigos.json
+
+Cada tamanho gera um CSV sintético (generate_sample_data.py) e mede upload, analyze,
+visualize, train e predict: percentis de latência, vazão, pico de memória (RSS) e bytes da resposta.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).parent
+ENDPOINTS = ('upload', 'analyze', 'analyze_cached', 'visualize', 'train', 'predict_one', 'predict_rows',
+             'predict_batch')
+
+
+def current_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # Sem /proc: ru_maxrss é o pico do processo inteiro (KB no Linux, bytes no macOS)
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class MedidorMemoria:
+    """Amostra o RSS em segundo plano durante uma chamada para estimar o pico."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start = current_rss()
+        self.peak = self.start
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def summarize(latencies, rows, response_bytes, rss_before, rss_peak, statuses):
+    latencies = np.asarray(latencies)
+    median = float(np.median(latencies))
+    return {
+        'n': len(latencies),
+        'latency_ms': {
+            'p50': median * 1000,
+            'p95': float(np.percentile(latencies, 95)) * 1000,
+            'p99': float(np.percentile(latencies, 99)) * 1000,
+            'mean': float(latencies.mean()) * 1000,
+            'min': float(latencies.min()) * 1000,
+            'max': float(latencies.max()) * 1000
+        },
+        'requests_per_s': 1 / median if median > 0 else None,
+        'rows_per_s': rows / median if median > 0 else None,
+        'response_bytes': int(np.median(response_bytes)),
+        'peak_rss_mb': max(rss_peak) / 1024**2,
+        'peak_rss_delta_mb': max(peak - before for before, peak in zip(rss_before, rss_peak)) / 1024**2,
+        'status': sorted(set(statuses))
+    }
+
+
+class Benchmark:
+    def __init__(self, client, repeat, model_type, warmup=1, target_column='NeedSupport'):
+        self.client = client
+        self.repeat = repeat
+        self.warmup = warmup
+        self.model_type = model_type
+        self.target_column = target_column
+
+    def measure(self, call, repeat=None, rows=0, before=None):
+        latencies, sizes, statuses, starts, peaks = [], [], [], [], []
+        # Rodadas de aquecimento (imports tardios, caches do SO) não entram nos números
+        for _ in range(self.warmup):
+            if before:
+                before()
+            call().get_data()
+        for _ in range(repeat or self.repeat):
+            if before:
+                before()
+            with MedidorMemoria() as memoria:
+                start = time.perf_counter()
+                response = call()
+                if response.mimetype == 'application/json':
+                    size = len(response.get_data())
+                else:
+                    # Consome respostas em streaming (NDJSON/CSV) sem juntar tudo na memória
+                    size = sum(len(part) for part in response.iter_encoded())
+                latencies.append(time.perf_counter() - start)
+            sizes.append(size)
+            statuses.append(response.status_code)
+            starts.append(memoria.start)
+            peaks.append(memoria.peak)
+        return summarize(latencies, rows, sizes, starts, peaks, statuses), response
+
+    def upload(self, csv_bytes):
+        return self.client.post('/api/upload', data={'file': (io.BytesIO(csv_bytes), 'benchmark.csv')},
+                                content_type='multipart/form-data')
+
+    def run(self, csv_path, n_rows, endpoints):
+        csv_bytes = csv_path.read_bytes()
+        results = {}
+        dataset_id = self.upload(csv_bytes).get_json()['dataset_id']
+
+        def drop_dataset():
+            self.client.delete(f'/api/datasets/{dataset_id}')
+
+        if 'upload' in endpoints:
+            results['upload'], _ = self.measure(lambda: self.upload(csv_bytes), rows=n_rows, before=drop_dataset)
+            self.upload(csv_bytes)
+
+        def clear_results():
+            self.client.delete('/api/cache')
+
+        payload = {'dataset_id': dataset_id}
+        if 'analyze' in endpoints:
+            results['analyze'], _ = self.measure(
+                lambda: self.client.post('/api/analyze', json=payload), rows=n_rows, before=clear_results
+            )
+        if 'analyze_cached' in endpoints:
+            self.client.post('/api/analyze', json=payload)
+            results['analyze_cached'], _ = self.measure(
+                lambda: self.client.post('/api/analyze', json=payload), repeat=self.repeat * 10, rows=n_rows
+            )
+        if 'visualize' in endpoints:
+            results['visualize'], _ = self.measure(
+                lambda: self.client.post('/api/visualize', json={**payload, 'binary': True}),
+                rows=n_rows, before=clear_results
+            )
+
+        train_payload = {**payload, 'model_type': self.model_type, 'target_column': self.target_column, 'wait': True}
+        if self.model_type == 'random_forest':
+            train_payload['params'] = {'n_estimators': 20, 'max_depth': 10}
+        results['train'], response = self.measure(
+            lambda: self.client.post('/api/train', json=train_payload), rows=n_rows,
+            repeat=self.repeat if 'train' in endpoints else 1
+        )
+        model_id = response.get_json().get('model_id')
+        if 'train' not in endpoints:
+            results.pop('train')
+        if model_id is None:
+            return results
+
+        import pandas as pd
+        sample = pd.read_csv(csv_path, nrows=1000)
+        records = sample.astype(object).where(pd.notna(sample), None).to_dict('records')
+        if 'predict_one' in endpoints:
+            results['predict_one'], _ = self.measure(
+                lambda: self.client.post('/api/predict', json={'model_id': model_id, 'record': records[0]}),
+                repeat=self.repeat * 50, rows=1
+            )
+        if 'predict_rows' in endpoints:
+            results['predict_rows'], _ = self.measure(
+                lambda: self.client.post('/api/predict', json={'model_id': model_id, 'data': records}),
+                rows=len(records)
+            )
+        if 'predict_batch' in endpoints:
+            results['predict_batch'], _ = self.measure(
+                lambda: self.client.post(
+                    '/api/predict/batch',
+                    data={'file': (io.BytesIO(csv_bytes), 'benchmark.csv'), 'model_id': model_id},
+                    content_type='multipart/form-data', buffered=False
+                ),
+                rows=n_rows
+            )
+        return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    baseline = json.loads(Path(baseline_path).read_text())
+    previous = {(run['dataset']['rows'], name): data for run in baseline['runs']
+                for name, data in run['results'].items()}
+    regressions = []
+    print(f"\n{'linhas':>10} {'endpoint':<16} {'p50 antes':>12} {'p50 agora':>12} {'variação':>10}")
+    for run in results['runs']:
+        for name, data in run['results'].items():
+            old = previous.get((run['dataset']['rows'], name))
+            if old is None:
+                continue
+            before, now = old['latency_ms']['p50'], data['latency_ms']['p50']
+            change = (now - before) / before if before else 0.0
+            flag = ' <-- regressão' if change > threshold else ''
+            print(f"{run['dataset']['rows']:>10} {name:<16} {before:>10.2f}ms {now:>10.2f}ms {change:>+9.1%}{flag}")
+            if flag:
+                regressions.append((run['dataset']['rows'], name, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos endpoints do backend')
+    parser.add_argument('--sizes', default='1000,100000', help='Tamanhos (linhas) separados por vírgula')
+    parser.add_argument('--extra-numeric', type=int, default=0, help='Colunas numéricas extras')
+    parser.add_argument('--extra-categorical', type=int, default=0, help='Colunas categóricas extras')
+    parser.add_argument('--cardinality', type=int, default=50, help='Categorias distintas por coluna extra')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetições por endpoint')
+    parser.add_argument('--warmup', type=int, default=1, help='Rodadas descartadas antes de medir')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='Endpoints medidos')
+    parser.add_argument('--model', default='decision_tree', help='Modelo usado em train/predict')
+    parser.add_argument('--data-dir', type=Path, default=BACKEND_DIR / 'data' / 'benchmark', help='Cache dos CSVs')
+    parser.add_argument('--output', type=Path, default=None, help='Arquivo JSON de resultados')
+    parser.add_argument('--compare', type=Path, default=None, help='JSON de uma execução anterior')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Aumento de p50 tolerado na comparação')
+    args = parser.parse_args()
+
+    endpoints = [e for e in args.endpoints.split(',') if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Endpoints desconhecidos: {', '.join(sorted(unknown))}")
+
+    # Caches e modelos do benchmark ficam isolados dos dados reais do servidor
+    work_dir = tempfile.mkdtemp(prefix='benchmark-')
+    os.environ.setdefault('COLUMNAR_CACHE_DIR', os.path.join(work_dir, 'cache'))
+    os.environ.setdefault('MODEL_STORE_DIR', os.path.join(work_dir, 'modelos'))
+    sys.path.insert(0, str(BACKEND_DIR))
+    from generate_sample_data import write_sample_csv
+    import app as backend
+
+    client = backend.app.test_client()
+    benchmark = Benchmark(client, args.repeat, args.model, warmup=args.warmup)
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {k: str(v) for k, v in vars(args).items()}
+        },
+        'runs': []
+    }
+
+    for n_rows in (int(size) for size in args.sizes.split(',')):
+        name = f'bench_{n_rows}_{args.extra_numeric}n_{args.extra_categorical}c_{args.cardinality}k.csv'
+        csv_path = args.data_dir / name
+        if not csv_path.exists():
+            print(f'Gerando {csv_path.name}...')
+            write_sample_csv(csv_path, n_rows, extra_numeric=args.extra_numeric,
+                             extra_categorical=args.extra_categorical, cardinality=args.cardinality)
+        print(f'Medindo {n_rows} linhas...')
+        run = {
+            'dataset': {
+                'rows': n_rows,
+                'extra_numeric': args.extra_numeric,
+                'extra_categorical': args.extra_categorical,
+                'cardinality': args.cardinality,
+                'file_bytes': csv_path.stat().st_size
+            },
+            'results': benchmark.run(csv_path, n_rows, endpoints)
+        }
+        results['runs'].append(run)
+        for endpoint, data in run['results'].items():
+            latency = data['latency_ms']
+            print(f"  {endpoint:<16} p50 {latency['p50']:>10.2f}ms  p95 {latency['p95']:>10.2f}ms  "
+                  f"pico RSS {data['peak_rss_mb']:>8.1f}MB  resposta {data['response_bytes']:>10} bytes")
+
+    output = args.output or args.data_dir / f"resultados_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f'Resultados salvos em: {output}')
+
+    backend.fila_treinamento.shutdown()
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
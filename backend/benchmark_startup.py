@@ -0,0 +1,82 @@
+"""Mede o tempo de inicialização do backend (import de app.py e primeira requisição).
+
+1. Execute: python benchmark_startup.py
+2. Para falhar quando o import passar de um limite: python benchmark_startup.py --max-import 1.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+# Roda em um processo novo a cada repetição para medir um cold start de verdade
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import app
+import_time = time.perf_counter() - start
+heavy = [name for name in ('sklearn', 'plotly', 'matplotlib', 'seaborn') if name in sys.modules]
+first_request = None
+if sys.argv[1] == '1':
+    client = app.app.test_client()
+    records = [{'x': float(i), 'y': float(i % 7), 'group': 'abc'[i % 3]} for i in range(200)]
+    start = time.perf_counter()
+    client.post('/api/visualize', json={'data': records})
+    first_request = time.perf_counter() - start
+print(json.dumps({'import_time': import_time, 'first_request': first_request, 'heavy_modules': heavy}))
+"""
+
+
+def run_once(first_request, prewarm):
+    env = dict(os.environ, PREWARM_IMPORTS='1' if prewarm else '0')
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE, '1' if first_request else '0'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(values):
+    return {
+        'median': statistics.median(values),
+        'min': min(values),
+        'max': max(values)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Número de processos medidos')
+    parser.add_argument('--first-request', action='store_true', help='Mede também a primeira chamada a /api/visualize')
+    parser.add_argument('--prewarm', action='store_true', help='Liga o pré-aquecimento de imports em segundo plano')
+    parser.add_argument('--max-import', type=float, default=None, help='Falha se a mediana do import passar deste valor (s)')
+    parser.add_argument('--output', type=Path, default=None, help='Salva o resultado em JSON')
+    args = parser.parse_args()
+
+    runs = [run_once(args.first_request, args.prewarm) for _ in range(args.repeat)]
+    result = {
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'prewarm': args.prewarm,
+        'import_time': summarize([run['import_time'] for run in runs]),
+        'heavy_modules_at_import': sorted({name for run in runs for name in run['heavy_modules']})
+    }
+    if args.first_request:
+        result['first_request'] = summarize([run['first_request'] for run in runs])
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+
+    if args.max_import is not None and result['import_time']['median'] > args.max_import:
+        print(f"Import de app.py levou {result['import_time']['median']:.3f}s (limite: {args.max_import:.3f}s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """1. Execute: python generate_sample_data.py
+2. Tamanhos maiores: python generate_sample_data.py --rows 1000000 --extra-numeric 20 --extra-categorical 10 --cardinality 500
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -12,8 +14,9 @@ if sys.platform == 'win32':
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
 
-def generate_sample_mental_health_data(n_samples=1000):
-    np.random.seed(42)
+def generate_sample_mental_health_data(n_samples=1000, extra_numeric=0, extra_categorical=0,
+                                       cardinality=50, seed=42):
+    np.random.seed(seed)
     
     genders = ['Male', 'Female', 'Non-binary', 'Prefer not to say']
     countries = [
@@ -54,27 +57,63 @@ def generate_sample_mental_health_data(n_samples=1000):
             missing_indices = np.random.choice(df.index, size=int(0.05 * n_samples), replace=False)
             df.loc[missing_indices, col] = np.nan
     
+    # Colunas extras para variar largura e cardinalidade nos benchmarks
+    rng = np.random.default_rng(seed + 1)
+    for i in range(extra_numeric):
+        df[f'num_{i}'] = rng.normal(loc=i, scale=1 + i % 5, size=n_samples)
+    for i in range(extra_categorical):
+        codes = rng.integers(0, cardinality, size=n_samples)
+        df[f'cat_{i}'] = pd.Categorical.from_codes(codes, [f'v{k}' for k in range(cardinality)]).astype(object)
+    
     return df
 
 
+def write_sample_csv(output_path, n_samples, chunk_rows=500_000, **kwargs):
+    # Gera e grava em blocos para que datasets de milhões de linhas não precisem caber na memória
+    seed = kwargs.pop('seed', 42)
+    written = 0
+    for i, start in enumerate(range(0, n_samples, chunk_rows)):
+        size = min(chunk_rows, n_samples - start)
+        chunk = generate_sample_mental_health_data(n_samples=size, seed=seed + i, **kwargs)
+        chunk.to_csv(output_path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+        written += size
+    return written
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos de saúde mental')
+    parser.add_argument('--rows', type=int, default=1000, help='Número de linhas')
+    parser.add_argument('--extra-numeric', type=int, default=0, help='Colunas numéricas extras')
+    parser.add_argument('--extra-categorical', type=int, default=0, help='Colunas categóricas extras')
+    parser.add_argument('--cardinality', type=int, default=50, help='Categorias distintas por coluna extra')
+    parser.add_argument('--output', type=Path, default=None, help='Arquivo CSV de saída')
+    args = parser.parse_args()
+
     print("Gerando dados de exemplo...")
     
     data_dir = Path(__file__).parent / 'data'
     data_dir.mkdir(exist_ok=True)
     
-    df = generate_sample_mental_health_data(n_samples=1000)
+    output_path = args.output or data_dir / 'sample_mental_health_data.csv'
+    options = dict(extra_numeric=args.extra_numeric, extra_categorical=args.extra_categorical,
+                   cardinality=args.cardinality)
+    if args.rows > 1_000_000:
+        n_rows = write_sample_csv(output_path, args.rows, **options)
+        print("Dados de exemplo gerados com sucesso!")
+        print(f"Arquivo salvo em: {output_path}")
+        print(f"Número de amostras: {n_rows}")
+        return
     
-    output_path = data_dir / 'sample_mental_health_data.csv'
+    df = generate_sample_mental_health_data(n_samples=args.rows, **options)
     df.to_csv(output_path, index=False)
     
-    print(f"Dados de exemplo gerados com sucesso!")
+    print("Dados de exemplo gerados com sucesso!")
     print(f"Arquivo salvo em: {output_path}")
     print(f"Número de amostras: {len(df)}")
     print(f"Número de colunas: {len(df.columns)}")
-    print(f"\nPrimeiras linhas:")
+    print("\nPrimeiras linhas:")
     print(df.head())
-    print(f"\nInformações do dataset:")
+    print("\nInformações do dataset:")
     print(df.info())
 
 
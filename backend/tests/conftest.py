@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os testes importam os módulos do backend como o app faz (utils.*)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,61 @@
+import io
+import pytest
+import app as app_module
+from utils.cache_colunar import CacheColunar
+from utils.registro_datasets import RegistroDatasets
+
+HISTORICO = 'grupo,valor\n' + '\n'.join(f'{g},{i}' for i, g in enumerate(['a', 'b', None, 'a'] * 50))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Registro com um único dataset: qualquer upload seguinte expulsa o anterior
+    monkeypatch.setattr(app_module, 'registro_datasets', RegistroDatasets(max_datasets=1))
+    monkeypatch.setattr(app_module, 'cache_colunar', CacheColunar(tmp_path / 'datasets'))
+    monkeypatch.setattr(app_module.cache_resultados, 'get', lambda key: None)
+    return app_module.app.test_client()
+
+
+def _upload(client, csv, **form):
+    response = client.post('/api/upload', data={'file': (io.BytesIO(csv.encode()), 'dados.csv'), **form})
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def _expulsar(client):
+    _upload(client, 'outra\n1\n2\n')
+
+
+def test_dataset_expulso_volta_do_cache_colunar(client):
+    dataset_id = _upload(client, HISTORICO)['dataset_id']
+    _expulsar(client)
+    response = client.post('/api/analyze', json={'dataset_id': dataset_id})
+    assert response.status_code == 200
+    assert response.json['total_rows'] == 200
+
+
+def test_append_expulso_mantem_id_e_perfil(client):
+    dataset_id = _upload(client, HISTORICO)['dataset_id']
+    appended = client.post(f'/api/datasets/{dataset_id}/append',
+                           data={'file': (io.BytesIO(b'grupo,valor\nb,1000\n,1001\n'), 'delta.csv')})
+    assert appended.status_code == 200, appended.json
+    new_id = appended.json['dataset_id']
+    _expulsar(client)
+
+    response = client.post('/api/analyze', json={'dataset_id': new_id})
+    assert response.status_code == 200
+    assert response.json['total_rows'] == 202
+    assert response.json['null_counts']['grupo'] == 51
+    assert app_module.registro_datasets.profile(new_id) is not None
+
+
+def test_amostra_de_upload_em_blocos_sobrevive_a_expulsao(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'STREAMING_SAMPLE_ROWS', 20)
+    uploaded = _upload(client, HISTORICO, mode='stream')
+    _expulsar(client)
+
+    response = client.post('/api/analyze', json={'dataset_id': uploaded['dataset_id']})
+    assert response.status_code == 200
+    assert response.json['total_rows'] == 200
+    assert response.json['sample_rows'] == 20
+    assert client.post('/api/visualize', json={'dataset_id': uploaded['dataset_id']}).status_code == 200
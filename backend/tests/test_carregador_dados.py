@@ -0,0 +1,39 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from utils.carregador_dados import CarregadorDados
+
+
+def _carregador(csv):
+    carregador = CarregadorDados()
+    carregador.load_csv(io.StringIO(csv), optimize=True)
+    return carregador
+
+
+HISTORICO = 'grupo,valor\n' + '\n'.join(f'{g},{i}' for i, g in enumerate(['a', 'b', 'a', 'b'] * 5))
+
+
+def test_append_com_coluna_categorica_vazia():
+    carregador = _carregador(HISTORICO)
+    assert isinstance(carregador.data['grupo'].dtype, pd.CategoricalDtype)
+    data, n_rows = carregador.append_csv(io.StringIO('grupo,valor\n,100\n,101\n'))
+    assert n_rows == 2
+    assert isinstance(data['grupo'].dtype, pd.CategoricalDtype)
+    assert data['grupo'].isna().sum() == 2
+    assert carregador.profile.null_counts['grupo'] == 2
+
+
+def test_append_com_valores_numericos_em_coluna_categorica():
+    carregador = _carregador(HISTORICO)
+    data, _ = carregador.append_csv(io.StringIO('grupo,valor\n1,100\n2,101\n'))
+    assert isinstance(data['grupo'].dtype, pd.CategoricalDtype)
+    assert data['grupo'].tail(2).tolist() == ['1', '2']
+    assert set(data['grupo'].cat.categories) == {'a', 'b', '1', '2'}
+
+
+def test_append_com_colunas_diferentes_gera_value_error():
+    carregador = _carregador(HISTORICO)
+    with pytest.raises(ValueError):
+        carregador.append_csv(io.StringIO('outra,valor\nx,1\n'))
+
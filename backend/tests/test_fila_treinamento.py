@@ -0,0 +1,41 @@
+import time
+from utils.fila_treinamento import FilaTreinamento
+
+
+def _dormir(segundos, progress=None, job_id=None):
+    time.sleep(segundos)
+    return None, {'slept': segundos}
+
+
+def _aguardar(fila, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while fila.status(job_id)['status'] not in FilaTreinamento.FINISHED_STATUSES and time.time() < deadline:
+        time.sleep(0.1)
+    return fila.status(job_id)['status']
+
+
+def test_submit_acima_de_max_jobs_mantem_jobs_em_andamento():
+    fila = FilaTreinamento(max_workers=1, max_jobs=1)
+    try:
+        job_ids = [fila.submit(_dormir, 1) for _ in range(3)]
+        # Nenhum job terminou: todos continuam rastreados mesmo acima do limite
+        assert all(fila.status(job_id) is not None for job_id in job_ids)
+        assert {fila.status(job_id)['status'] for job_id in job_ids} <= {'queued', 'running'}
+        for job_id in job_ids:
+            fila.cancel(job_id)
+        # O job já em execução não é cancelável; espera terminar antes de desligar o pool
+        assert {_aguardar(fila, job_id) for job_id in job_ids} <= set(FilaTreinamento.FINISHED_STATUSES)
+    finally:
+        fila.shutdown()
+
+
+def test_jobs_encerrados_sao_removidos_ao_passar_do_limite():
+    fila = FilaTreinamento(max_workers=1, max_jobs=1)
+    try:
+        primeiro = fila.submit(_dormir, 0)
+        assert _aguardar(fila, primeiro) == 'done'
+        segundo = fila.submit(_dormir, 0)
+        assert fila.status(primeiro) is None
+        assert _aguardar(fila, segundo) == 'done'
+    finally:
+        fila.shutdown()
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from utils.visualizadorr import VisualizadorDados
+
+
+def _pontos(n=200):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'x': rng.normal(size=n), 'y': rng.normal(size=n),
+                         'grupo': rng.choice(['a', 'b'], size=n)})
+
+
+def test_scatter_com_aggregate_true_agrega_dataset_pequeno():
+    fig = VisualizadorDados(_pontos(), aggregate=True).plot_scatter('x', 'y')
+
+    assert fig.data[0].type == 'heatmap'
+    assert np.nansum(np.asarray(fig.data[0].z, dtype='float64')) == 200
+
+
+def test_scatter_com_aggregate_true_e_cor_mantem_todos_os_pontos_abaixo_do_limite():
+    fig = VisualizadorDados(_pontos(), aggregate=True).plot_scatter('x', 'y', color_column='grupo')
+
+    assert sum(len(trace.x) for trace in fig.data) == 200
+
+
+def test_scatter_auto_nao_agrega_abaixo_do_limite():
+    fig = VisualizadorDados(_pontos()).plot_scatter('x', 'y')
+
+    assert fig.data[0].type == 'scatter'
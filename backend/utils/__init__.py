@@ -1,5 +1,19 @@
 from .carregador_dados import CarregadorDados
 from .visualizadorr import VisualizadorDados
 from .modelos_ml import GerenciadorModelosML
+from .registro_datasets import RegistroDatasets
+from .cache_colunar import CacheColunar
+from .perfil_incremental import PerfilIncremental
+from .cache_resultados import CacheResultados
+from .estatisticas import MotorEstatisticas
+from .correlacoes import MotorCorrelacoes
+from .registro_modelos import RegistroModelos
+from .fila_treinamento import FilaTreinamento
+from .codificador_categorico import CodificadorCategorico
+from .arvores_compiladas import FlorestaCompilada
+from .coletor_predicoes import ColetorPredicoes
+from .armazem_modelos import ArmazemModelos
+from .instrumentacao import MetricasPrometheus
+from .serializacao_json import JSONPronto, ProvedorJSONRapido, QuadroJSON
 
-__all__ = ['CarregadorDados', 'VisualizadorDados', 'GerenciadorModelosML']
+__all__ = ['CarregadorDados', 'VisualizadorDados', 'GerenciadorModelosML', 'RegistroDatasets', 'CacheColunar', 'PerfilIncremental', 'CacheResultados', 'MotorEstatisticas', 'MotorCorrelacoes', 'RegistroModelos', 'FilaTreinamento', 'CodificadorCategorico', 'FlorestaCompilada', 'ColetorPredicoes', 'ArmazemModelos', 'MetricasPrometheus', 'JSONPronto', 'ProvedorJSONRapido', 'QuadroJSON']
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from .modelos_ml import GerenciadorModelosML
+
+
+class ArmazemModelos:
+    NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+    EXTENSION = '.joblib'
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def validate_name(cls, name):
+        if not name or not cls.NAME_PATTERN.match(name):
+            raise ValueError("Nome de modelo inválido (use letras, números, '_' ou '-')")
+        return name
+
+    def _versions(self, name):
+        folder = self.directory / name
+        if not folder.is_dir():
+            return []
+        return sorted(int(path.stem[1:]) for path in folder.glob(f'v*{self.EXTENSION}') if path.stem[1:].isdigit())
+
+    def _paths(self, name, version):
+        folder = self.directory / name
+        return folder / f'v{version}{self.EXTENSION}', folder / f'v{version}.json'
+
+    def save(self, name, gerenciador, metadata=None, compiled_only=False):
+        self.validate_name(name)
+        with self._lock:
+            versions = self._versions(name)
+            version = versions[-1] + 1 if versions else 1
+            model_path, meta_path = self._paths(name, version)
+            model_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = model_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+            try:
+                # Sem compressão: arquivos comprimidos não podem ser abertos com mmap
+                gerenciador.save_model(tmp_path, compiled_only=compiled_only)
+                os.replace(tmp_path, model_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            entry = {
+                **(metadata or {}),
+                'name': name,
+                'version': version,
+                'model_name': gerenciador.model_name,
+                'feature_names': gerenciador.feature_names,
+                'compiled': gerenciador.compiled is not None,
+                'compiled_only': compiled_only,
+                'saved_at': datetime.now(timezone.utc).isoformat(),
+                'size_bytes': model_path.stat().st_size
+            }
+            meta_path.write_text(json.dumps(entry, default=str))
+        return entry
+
+    def resolve(self, name, version=None):
+        self.validate_name(name)
+        versions = self._versions(name)
+        if not versions:
+            return None
+        version = int(version) if version is not None else versions[-1]
+        return version if version in versions else None
+
+    def load(self, name, version=None, mmap=True):
+        version = self.resolve(name, version)
+        if version is None:
+            return None, None
+        model_path, meta_path = self._paths(name, version)
+        gerenciador = GerenciadorModelosML()
+        gerenciador.load_model(model_path, mmap_mode='r' if mmap else None)
+        metadata = json.loads(meta_path.read_text()) if meta_path.exists() else {'name': name, 'version': version}
+        return gerenciador.finalize(), metadata
+
+    def list(self):
+        entries = []
+        for folder in sorted(self.directory.iterdir()):
+            if not folder.is_dir():
+                continue
+            for version in self._versions(folder.name):
+                meta_path = self._paths(folder.name, version)[1]
+                try:
+                    entries.append(json.loads(meta_path.read_text()))
+                except (OSError, ValueError):
+                    entries.append({'name': folder.name, 'version': version})
+        return entries
+
+    def delete(self, name, version=None):
+        self.validate_name(name)
+        with self._lock:
+            if version is None:
+                folder = self.directory / name
+                if not folder.is_dir():
+                    return False
+                shutil.rmtree(folder)
+                return True
+            version = self.resolve(name, version)
+            if version is None:
+                return False
+            for path in self._paths(name, version):
+                path.unlink(missing_ok=True)
+            return True
@@ -0,0 +1,151 @@
+import numpy as np
+
+# Valor de feature que o sklearn usa para marcar folhas
+_FOLHA = -2
+
+
+class FlorestaCompilada:
+    """Árvores de decisão achatadas em arrays NumPy contíguos, percorridas em lote.
+
+    Todas as árvores ficam em um único conjunto de arrays; folhas apontam para si mesmas, então
+    cada passo da travessia é a mesma operação vetorizada para todas as linhas e árvores.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_slot, leaf_values, roots, max_depth,
+                 n_features, classes, feature_importances=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_slot = leaf_slot
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.classes = classes
+        self.feature_importances = feature_importances
+
+    @classmethod
+    def supports(cls, model):
+        return hasattr(model, 'tree_') or (
+            hasattr(model, 'estimators_') and all(hasattr(tree, 'tree_') for tree in model.estimators_)
+        )
+
+    @classmethod
+    def from_estimator(cls, model):
+        if not cls.supports(model):
+            raise ValueError("Só árvores de decisão e florestas podem ser compiladas")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Árvores com múltiplas saídas não são suportadas")
+        trees = [model.tree_] if hasattr(model, 'tree_') else [tree.tree_ for tree in model.estimators_]
+
+        features, thresholds, lefts, rights, slots, values, roots = [], [], [], [], [], [], []
+        offset, n_leaves = 0, 0
+        for tree in trees:
+            n_nodes = tree.node_count
+            is_leaf = tree.feature == _FOLHA
+            node_ids = np.arange(offset, offset + n_nodes)
+            roots.append(offset)
+            # Folha: aponta para si mesma e nunca muda de nó nos passos seguintes
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            slot = np.full(n_nodes, -1, dtype=np.int64)
+            slot[is_leaf] = np.arange(n_leaves, n_leaves + is_leaf.sum())
+            slots.append(slot)
+            # Só as folhas guardam a distribuição de classes (o sklearn guarda para todos os nós)
+            leaf_values = tree.value[is_leaf, 0, :]
+            values.append(leaf_values / leaf_values.sum(axis=1, keepdims=True))
+            offset += n_nodes
+            n_leaves += int(is_leaf.sum())
+
+        index_dtype = np.int32 if offset < np.iinfo(np.int32).max else np.int64
+        feature_dtype = np.int16 if model.n_features_in_ < np.iinfo(np.int16).max else np.int32
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=feature_dtype),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=index_dtype),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=index_dtype),
+            leaf_slot=np.ascontiguousarray(np.concatenate(slots), dtype=index_dtype),
+            leaf_values=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=index_dtype),
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=model.n_features_in_,
+            classes=np.asarray(model.classes_),
+            feature_importances=getattr(model, 'feature_importances_', None)
+        )
+
+    @property
+    def nbytes(self):
+        arrays = (self.feature, self.threshold, self.left, self.right, self.leaf_slot, self.leaf_values, self.roots)
+        return sum(array.nbytes for array in arrays)
+
+    def apply(self, X):
+        """Índice da folha alcançada por cada linha em cada árvore, shape (n_linhas, n_árvores)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Esperadas {self.n_features} colunas")
+        n_trees = len(self.roots)
+        flat = X.ravel()
+        nodes = np.tile(self.roots, len(X))
+        # Pares (linha, árvore) ainda em nós internos; os que chegam a uma folha saem do lote
+        active = np.arange(len(nodes))
+        current = nodes.copy()
+        row_offsets = np.repeat(np.arange(len(X), dtype=np.int64) * self.n_features, n_trees)
+        for _ in range(self.max_depth):
+            values = flat[row_offsets + self.feature[current]]
+            # NaN vai para a direita, como no sklearn (x <= limiar é falso)
+            go_right = ~(values <= self._threshold32[current])
+            current = self._children[2 * current + go_right]
+            done = self._is_leaf[current]
+            if done.any():
+                nodes[active[done]] = current[done]
+                keep = ~done
+                active, current, row_offsets = active[keep], current[keep], row_offsets[keep]
+                if not len(active):
+                    break
+        nodes[active] = current
+        return self.leaf_slot[nodes].reshape(len(X), n_trees)
+
+    @property
+    def _children(self):
+        # Filhos intercalados: um único gather por passo em vez de dois
+        children = self.__dict__.get('_children_cache')
+        if children is None:
+            children = np.stack([self.left, self.right], axis=1).ravel()
+            self.__dict__['_children_cache'] = children
+        return children
+
+    @property
+    def _is_leaf(self):
+        is_leaf = self.__dict__.get('_is_leaf_cache')
+        if is_leaf is None:
+            is_leaf = self.__dict__['_is_leaf_cache'] = self.leaf_slot >= 0
+        return is_leaf
+
+    @property
+    def _threshold32(self):
+        # Maior float32 <= limiar: comparar em float32 dá o mesmo resultado que x(float32) <= limiar(float64)
+        threshold = self.__dict__.get('_threshold32_cache')
+        if threshold is None:
+            threshold = self.threshold.astype(np.float32)
+            above = threshold.astype(np.float64) > self.threshold
+            threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+            self.__dict__['_threshold32_cache'] = threshold
+        return threshold
+
+    def __getstate__(self):
+        # Caches derivados não vão para o arquivo salvo
+        return {k: v for k, v in self.__dict__.items() if not k.endswith('_cache')}
+
+    def predict_proba(self, X, block_rows=4096):
+        out = np.empty((len(X), self.leaf_values.shape[1]))
+        # Blocos de linhas mantêm os arrays temporários (linhas x árvores) pequenos
+        for start in range(0, len(X), block_rows):
+            leaves = self.apply(X[start:start + block_rows])
+            out[start:start + block_rows] = self.leaf_values[leaves].mean(axis=1)
+        return out
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
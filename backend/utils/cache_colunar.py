@@ -0,0 +1,126 @@
+from pathlib import Path
+import os
+import pickle
+import threading
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+    ipc = None
+
+
+class CacheColunar:
+    EXTENSION = '.arrow'
+    # Metadados opcionais guardados ao lado do arquivo Arrow (ex.: perfil incremental)
+    EXTRA_EXTENSION = '.extra.pkl'
+
+    def __init__(self, directory, max_bytes=5 * 1024**3):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = pa is not None
+        self._lock = threading.Lock()
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / f'{key}{self.EXTENSION}'
+
+    def _extra_path(self, key):
+        return self.directory / f'{key}{self.EXTRA_EXTENSION}'
+
+    def __contains__(self, key):
+        return self.enabled and self._path(key).exists()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            # Arquivo IPC sem compressão: os buffers numéricos apontam direto para o mmap
+            source = pa.memory_map(str(path), 'r')
+            table = ipc.open_file(source).read_all()
+        except (FileNotFoundError, pa.ArrowException):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Removido por _enforce_limit depois da leitura; o mmap já aberto continua válido
+            pass
+        return table.to_pandas(split_blocks=True)
+
+    def get_extra(self, key):
+        if not self.enabled:
+            return None
+        try:
+            with open(self._extra_path(key), 'rb') as file:
+                return pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key, df, extra=None):
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        tmp_path = path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        extra_tmp_path = self._extra_path(key).with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            if extra is not None:
+                # Metadados primeiro: quem encontra o .arrow já encontra o que o acompanha
+                with open(extra_tmp_path, 'wb') as file:
+                    pickle.dump(extra, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(extra_tmp_path, self._extra_path(key))
+            os.replace(tmp_path, path)
+        except (OSError, pa.ArrowException, pickle.PicklingError):
+            tmp_path.unlink(missing_ok=True)
+            extra_tmp_path.unlink(missing_ok=True)
+            return False
+        self._enforce_limit(keep=path)
+        return True
+
+    def remove(self, key):
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        self._extra_path(key).unlink(missing_ok=True)
+        if not path.exists():
+            return False
+        path.unlink(missing_ok=True)
+        return True
+
+    def _enforce_limit(self, keep=None):
+        with self._lock:
+            files = []
+            for path in self.directory.glob(f'*{self.EXTENSION}'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                self._extra_path(path.name[:-len(self.EXTENSION)]).unlink(missing_ok=True)
+                total -= size
+
+    def stats(self):
+        if not self.enabled:
+            return {'enabled': False}
+        sizes = [path.stat().st_size for path in self.directory.glob(f'*{self.EXTENSION}')]
+        return {
+            'enabled': True,
+            'directory': str(self.directory),
+            'files': len(sizes),
+            'total_bytes': sum(sizes),
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import pandas as pd
+
+
+class CacheResultados:
+    def __init__(self, max_bytes=256 * 1024**2, max_items=1024):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fingerprint_dataframe(df):
+        digest = hashlib.sha256()
+        digest.update(json.dumps([str(c) for c in df.columns]).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()[:32]
+
+    @staticmethod
+    def make_key(namespace, fingerprint, params=None):
+        encoded = json.dumps(params or {}, sort_keys=True, default=str)
+        return f'{namespace}:{fingerprint}:{hashlib.sha256(encoded.encode()).hexdigest()[:16]}'
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_items or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def invalidate(self, fingerprint=None):
+        with self._lock:
+            if fingerprint is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._total_bytes = 0
+                return removed
+            keys = [key for key in self._entries if key.split(':')[1] == fingerprint]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'items': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
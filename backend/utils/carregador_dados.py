@@ -1,24 +1,259 @@
+import hashlib
+import io
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
+from .perfil_incremental import PerfilIncremental
+from .importacao_tardia import ModuloTardio
+
+preprocessing = ModuloTardio('sklearn.preprocessing')
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+
+class _LeitorComHash(io.RawIOBase):
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        block = self.raw.read(len(buffer))
+        n = len(block)
+        buffer[:n] = block
+        self.digest.update(block)
+        self.bytes_read += n
+        return n
 
 
 class CarregadorDados:
-    def _init_(self):
+    def __init__(self, cache=None):
         self.data = None
+        self.profile = None
         self.label_encoders = {}
+        self.cache = cache
 
-    def load_csv(self, file):
+    def load_csv(self, file, cache_key=None, optimize=False):
+        self.profile = None
+        if self.cache is not None and cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.data = cached
+                return self.data
         try:
             self.data = pd.read_csv(file)
-            return self.data
         except Exception as e:
             raise ValueError(f"Erro ao carregar arquivo CSV: {str(e)}")
+        if optimize:
+            self.data = self.optimize_dtypes(self.data)
+        if self.cache is not None and cache_key:
+            self.cache.put(cache_key, self.data)
+        return self.data
+
+    @staticmethod
+    def optimize_dtypes(df, max_category_ratio=0.5):
+        memory_before = int(df.memory_usage(deep=True).sum())
+        optimized = {}
+        for col in df.columns:
+            series = df[col]
+            if series.dtype == object:
+                n_unique = series.nunique(dropna=True)
+                if len(series) > 0 and n_unique / len(series) <= max_category_ratio:
+                    optimized[col] = series.astype('category')
+            elif series.dtype.kind in 'iu':
+                optimized[col] = pd.to_numeric(series, downcast='integer')
+            elif series.dtype == np.float64:
+                downcast = series.astype(np.float32)
+                # Só reduz a precisão quando a conversão não altera nenhum valor
+                if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+                    optimized[col] = downcast
+
+        if optimized:
+            df = df.assign(**optimized)
+        df.attrs['memory_usage_before'] = memory_before
+        return df
+
+    def load_csv_streaming(self, file, chunksize=100_000, sample_size=10_000):
+        reader = _LeitorComHash(file)
+        profile = PerfilIncremental(sample_size=sample_size)
+        try:
+            with pd.read_csv(io.BufferedReader(reader), chunksize=chunksize) as chunks:
+                for chunk in chunks:
+                    profile.update(chunk)
+        except Exception as e:
+            raise ValueError(f"Erro ao carregar arquivo CSV: {str(e)}")
+        # Garante que o hash cubra bytes que o parser eventualmente não tenha consumido
+        while reader.readinto(bytearray(1024 * 1024)):
+            pass
+
+        self.profile = profile
+        self.data = profile.sample if profile.sample is not None else pd.DataFrame(columns=profile.columns)
+        return profile, reader.digest.hexdigest()[:32]
+
+    def append_csv(self, file, profile=None, base_size=None):
+        """Acrescenta as linhas de um CSV aos dados atuais, atualizando o perfil só com o bloco novo."""
+        if self.data is None:
+            raise ValueError("Nenhum dado carregado")
+        try:
+            delta = pd.read_csv(file)
+        except Exception as e:
+            raise ValueError(f"Erro ao carregar arquivo CSV: {str(e)}")
+        missing = [col for col in self.data.columns if col not in delta.columns]
+        extra = [col for col in delta.columns if col not in self.data.columns]
+        if missing or extra:
+            raise ValueError(f"Colunas diferentes do dataset (faltando: {missing}, novas: {extra})")
+        try:
+            delta = self.align_dtypes(delta[self.data.columns.tolist()], self.data)
+        except (TypeError, ValueError) as e:
+            # Tipos que não se convertem viram erro do usuário (400), não do servidor
+            raise ValueError(f"Tipos das colunas incompatíveis com o dataset: {str(e)}")
+
+        if profile is None:
+            # Primeiro append: o perfil do histórico é calculado uma única vez
+            profile = self.build_profile(self.data)
+        profile.update(delta)
+        if base_size is None:
+            base_size = self.data.attrs.get('memory_usage')
+        if base_size is None:
+            base_size = int(self.data.memory_usage(deep=True).sum())
+        combined = self.concat_aligned(self.data, delta)
+        # Tamanho do histórico somado ao do bloco novo, sem medir o resultado inteiro de novo
+        combined.attrs['memory_usage'] = base_size + int(delta.memory_usage(deep=True).sum())
+        self.data = combined
+        self.profile = profile
+        return self.data, len(delta)
+
+    @staticmethod
+    def build_profile(df, bins=30, max_categories=1000):
+        profile = PerfilIncremental(sample_size=None, bins=bins, max_categories=max_categories)
+        if len(df):
+            profile.update(df)
+        return profile
+
+    @classmethod
+    def align_dtypes(cls, delta, reference):
+        # Reduz o bloco novo como no upload e alinha cada coluna ao tipo já usado no dataset
+        delta = cls.optimize_dtypes(delta)
+        aligned = {}
+        for col in delta.columns:
+            current, new = reference[col].dtype, delta[col].dtype
+            if isinstance(current, pd.CategoricalDtype):
+                aligned[col] = cls._as_categories_of(delta[col], current)
+            elif isinstance(new, pd.CategoricalDtype):
+                aligned[col] = delta[col].astype(current)
+            elif current.kind in 'iufb' and new.kind in 'iufb' and current != new:
+                aligned[col] = delta[col].astype(np.result_type(current, new))
+        if aligned:
+            delta = delta.assign(**aligned)
+        return delta
+
+    @staticmethod
+    def _as_categories_of(series, reference):
+        # Categórica com categorias do mesmo tipo do histórico; senão union_categoricals recusa a união
+        categories_dtype = reference.categories.dtype
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        if categories_dtype == object and series.dtype != object:
+            # Bloco só com números ('1', '2') ou só nulos é lido como numérico; o histórico guarda texto
+            if series.dtype.kind == 'f' and (series.dropna() % 1 == 0).all():
+                series = series.astype('Int64')
+            series = series.astype(object).where(series.notna(), None).map(str, na_action='ignore')
+        categories = pd.Index(series.dropna().unique())
+        try:
+            categories = categories.astype(categories_dtype)
+        except (TypeError, ValueError):
+            raise ValueError(f"Coluna '{series.name}' incompatível com as categorias do dataset")
+        return pd.Series(pd.Categorical(series, categories=categories), index=series.index, name=series.name)
+
+    @staticmethod
+    def concat_aligned(data, delta):
+        columns = {}
+        for col in data.columns:
+            if isinstance(data[col].dtype, pd.CategoricalDtype):
+                # Une as categorias sem cair para object
+                try:
+                    columns[col] = pd.api.types.union_categoricals([data[col].array, delta[col].array])
+                except TypeError as e:
+                    raise ValueError(f"Coluna '{col}' incompatível com o dataset: {str(e)}")
+            else:
+                columns[col] = pd.concat([data[col], delta[col]], ignore_index=True)
+        combined = pd.DataFrame(columns, columns=data.columns)
+        if 'memory_usage_before' in data.attrs:
+            combined.attrs['memory_usage_before'] = (data.attrs['memory_usage_before']
+                                                     + delta.attrs.get('memory_usage_before', 0))
+        return combined
+
+    @staticmethod
+    def iter_chunks(file, file_format='csv', chunksize=50_000):
+        # Lê o arquivo em blocos de tamanho fixo sem materializá-lo inteiro na memória
+        if file_format == 'csv':
+            try:
+                with pd.read_csv(file, chunksize=chunksize) as chunks:
+                    yield from chunks
+            except (pd.errors.ParserError, UnicodeDecodeError) as e:
+                raise ValueError(f"Erro ao carregar arquivo CSV: {str(e)}")
+            return
+        if file_format != 'arrow':
+            raise ValueError(f"Formato '{file_format}' não suportado")
+        if pa is None:
+            raise ValueError("Leitura de Arrow requer o pacote pyarrow")
+
+        try:
+            reader = ipc.open_file(file)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            # Sem rodapé de arquivo: trata como formato de stream IPC
+            file.seek(0)
+            batches = ipc.open_stream(file)
+        pending, pending_rows = [], 0
+        for batch in batches:
+            while batch.num_rows:
+                take = min(chunksize - pending_rows, batch.num_rows)
+                pending.append(batch.slice(0, take))
+                pending_rows += take
+                batch = batch.slice(take)
+                if pending_rows == chunksize:
+                    yield pa.Table.from_batches(pending).to_pandas()
+                    pending, pending_rows = [], 0
+        if pending:
+            yield pa.Table.from_batches(pending).to_pandas()
 
     def get_data_info(self):
         if self.data is None:
             return None
         
+        if self.profile is not None and self.profile.sample_size is None:
+            # Dados completos com perfil incremental (append): contagens e tamanho vêm do append, sem reler as linhas
+            memory_usage = self.data.attrs.get('memory_usage')
+            if memory_usage is None:
+                memory_usage = self.data.memory_usage(deep=True).sum()
+            return {
+                'n_rows': self.profile.n_rows,
+                'n_columns': len(self.data.columns),
+                'columns': list(self.data.columns),
+                'dtypes': self.data.dtypes.to_dict(),
+                'missing_values': dict(self.profile.null_counts),
+                'memory_usage': memory_usage / 1024**2
+            }
+        
+        if self.profile is not None:
+            profile = self.profile.to_dict()
+            return {
+                'n_rows': profile['n_rows'],
+                'n_columns': profile['n_columns'],
+                'columns': profile['columns'],
+                'dtypes': profile['dtypes'],
+                'missing_values': profile['missing_values'],
+                'memory_usage': self.data.memory_usage(deep=True).sum() / 1024**2,
+                'sample_size': profile['sample_size']
+            }
+        
         info = {
             'n_rows': len(self.data),
             'n_columns': len(self.data.columns),
@@ -27,6 +262,10 @@ class CarregadorDados:
             'missing_values': self.data.isnull().sum().to_dict(),
             'memory_usage': self.data.memory_usage(deep=True).sum() / 1024**2
         }
+        memory_before = self.data.attrs.get('memory_usage_before')
+        if memory_before:
+            info['memory_usage_before'] = memory_before / 1024**2
+            info['memory_reduction'] = 1 - info['memory_usage'] / info['memory_usage_before']
         return info
 
     def get_column_types(self):
@@ -34,7 +273,7 @@ class CarregadorDados:
             return None
         
         numeric_cols = self.data.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = self.data.select_dtypes(include=['object']).columns.tolist()
+        categorical_cols = self.data.select_dtypes(include=['object', 'category']).columns.tolist()
         
         return {
             'numeric': numeric_cols,
@@ -54,20 +293,20 @@ class CarregadorDados:
             X = df
             y = None
         
-        categorical_cols = X.select_dtypes(include=['object']).columns
+        categorical_cols = X.select_dtypes(include=['object', 'category']).columns
         
         for col in categorical_cols:
             if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
+                self.label_encoders[col] = preprocessing.LabelEncoder()
                 X[col] = self.label_encoders[col].fit_transform(X[col].astype(str))
             else:
                 X[col] = self.label_encoders[col].transform(X[col].astype(str))
         
         X = X.fillna(X.mean() if len(X.select_dtypes(include=[np.number]).columns) > 0 else 0)
         
-        if y is not None and y.dtype == 'object':
+        if y is not None and (y.dtype == 'object' or isinstance(y.dtype, pd.CategoricalDtype)):
             if 'target' not in self.label_encoders:
-                self.label_encoders['target'] = LabelEncoder()
+                self.label_encoders['target'] = preprocessing.LabelEncoder()
                 y = self.label_encoders['target'].fit_transform(y.astype(str))
             else:
                 y = self.label_encoders['target'].transform(y.astype(str))
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+
+class CodificadorCategorico:
+    STRATEGIES = ('ordinal', 'onehot', 'target')
+    # Código reservado para categorias ausentes ou não vistas no treino
+    UNSEEN_CODE = -1
+
+    def __init__(self, strategy='ordinal', max_onehot_categories=32, smoothing=10.0):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Codificação '{strategy}' não suportada")
+        self.strategy = strategy
+        self.max_onehot_categories = max_onehot_categories
+        self.smoothing = smoothing
+        self.columns = []
+        self.categories = {}
+        self.lookups = {}
+        self.encodings = {}
+        self.fill_values = {}
+        self.target_tables = {}
+        self.prior = None
+        self.output_names = []
+
+    @staticmethod
+    def _is_categorical(series):
+        return not is_numeric_dtype(series.dtype) or is_bool_dtype(series.dtype)
+
+    def fit(self, X, y=None):
+        if self.strategy == 'target' and y is None:
+            raise ValueError("Codificação por alvo exige a coluna alvo")
+        self.columns = X.columns.tolist()
+        self.categories, self.lookups, self.encodings, self.fill_values, self.target_tables = {}, {}, {}, {}, {}
+        if y is not None:
+            y = np.asarray(y)
+            n_classes = int(y.max()) + 1 if len(y) else 0
+            self.prior = np.bincount(y, minlength=n_classes) / max(len(y), 1)
+
+        for col in self.columns:
+            series = X[col]
+            if not self._is_categorical(series):
+                # Mediana do treino substitui nulos numéricos (KNN e regressão logística não aceitam NaN)
+                median = series.median()
+                self.fill_values[col] = 0.0 if pd.isna(median) else float(median)
+                continue
+            # Tabela de consulta categoria -> código, construída uma única vez por coluna;
+            # índice simples (não categórico) para os códigos seguirem a ordem da própria tabela
+            categories = pd.Index(np.asarray(series.dropna().unique(), dtype=object))
+            self.categories[col] = categories
+            # Dicionário equivalente usado pelo caminho sem pandas (transform_records)
+            self.lookups[col] = {category: code for code, category in enumerate(categories)}
+            encoding = self.strategy
+            if encoding == 'onehot' and len(categories) > self.max_onehot_categories:
+                encoding = 'ordinal'
+            self.encodings[col] = encoding
+            if encoding == 'target':
+                self.target_tables[col] = self._target_table(self._codes(series, categories), y, len(categories))
+
+        self.output_names = []
+        for col in self.columns:
+            encoding = self.encodings.get(col)
+            if encoding == 'onehot':
+                self.output_names.extend(f'{col}={category}' for category in self.categories[col])
+            elif encoding == 'target' and len(self.prior) > 2:
+                self.output_names.extend(f'{col}:p{k}' for k in range(len(self.prior)))
+            else:
+                self.output_names.append(col)
+        return self
+
+    def _target_table(self, codes, y, n_categories):
+        # Média suavizada do alvo por categoria; a linha extra guarda a priori para não vistas
+        n_classes = len(self.prior)
+        valid = codes >= 0
+        counts = np.zeros((n_categories, n_classes))
+        np.add.at(counts, (codes[valid], y[valid]), 1)
+        totals = counts.sum(axis=1, keepdims=True)
+        table = (counts + self.smoothing * self.prior) / (totals + self.smoothing)
+        table = np.vstack([table, self.prior])
+        # Alvo binário: basta a probabilidade da classe positiva
+        return table[:, 1:] if n_classes == 2 else table
+
+    @classmethod
+    def _codes(cls, series, categories):
+        codes = pd.Categorical(series, categories=categories).codes.astype(np.int64)
+        codes[codes < 0] = cls.UNSEEN_CODE
+        return codes
+
+    def transform(self, X):
+        missing = [col for col in self.columns if col not in X.columns]
+        if missing:
+            raise ValueError(f"Colunas ausentes: {', '.join(map(str, missing))}")
+        return self._encode(
+            len(X),
+            lambda col: X[col].to_numpy(dtype=np.float64, na_value=np.nan),
+            lambda col: self._codes(X[col], self.categories[col])
+        )
+
+    def transform_records(self, records):
+        # Caminho sem pandas para lotes pequenos de registros (dicts) vindos do JSON
+        missing = [col for col in self.columns if col not in records[0]]
+        if missing:
+            raise ValueError(f"Colunas ausentes: {', '.join(map(str, missing))}")
+
+        def numeric(col):
+            return np.array([np.nan if r.get(col) is None else r.get(col) for r in records], dtype=np.float64)
+
+        def codes(col):
+            lookup = self.lookups[col]
+            return np.fromiter(
+                (lookup.get(r.get(col), self.UNSEEN_CODE) for r in records), dtype=np.int64, count=len(records)
+            )
+
+        return self._encode(len(records), numeric, codes)
+
+    def _encode(self, n_rows, numeric, codes_for):
+        out = np.empty((n_rows, len(self.output_names)), dtype=np.float64)
+        offset = 0
+        for col in self.columns:
+            encoding = self.encodings.get(col)
+            if encoding is None:
+                values = out[:, offset]
+                values[:] = numeric(col)
+                np.copyto(values, self.fill_values[col], where=np.isnan(values))
+                offset += 1
+                continue
+
+            codes = codes_for(col)
+            if encoding == 'ordinal':
+                out[:, offset] = codes
+                offset += 1
+            elif encoding == 'onehot':
+                width = len(self.categories[col])
+                block = out[:, offset:offset + width]
+                block[:] = 0.0
+                rows = np.flatnonzero(codes >= 0)
+                block[rows, codes[rows]] = 1.0
+                offset += width
+            else:
+                table = self.target_tables[col]
+                # Códigos não vistos (-1) apontam para a última linha, a da priori
+                out[:, offset:offset + table.shape[1]] = table[codes]
+                offset += table.shape[1]
+        return out
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y).transform(X)
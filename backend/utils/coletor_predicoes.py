@@ -0,0 +1,91 @@
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+
+class ColetorPredicoes:
+    def __init__(self, max_wait_ms=2.0, max_batch_size=256):
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.requests = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='coletor-predicoes', daemon=True)
+                self._thread.start()
+
+    def submit(self, gerenciador, record):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((gerenciador, record, future))
+        return future
+
+    def predict(self, gerenciador, record, timeout=None):
+        return self.submit(gerenciador, record).result(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            # Espera no máximo max_wait a partir do primeiro pedido; o que chegar nesse meio tempo entra no lote
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        groups = {}
+        for gerenciador, record, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(id(gerenciador), (gerenciador, []))[1].append((record, future))
+
+        for gerenciador, items in groups.values():
+            with self._lock:
+                self.requests += len(items)
+                self.batches += 1
+            try:
+                predictions = gerenciador.predict_records([record for record, _ in items])
+            except Exception as e:
+                if len(items) == 1:
+                    items[0][1].set_exception(e)
+                    continue
+                # Um registro inválido não deve derrubar o lote inteiro: repete um a um
+                for record, future in items:
+                    try:
+                        future.set_result(gerenciador.predict_records([record])[0])
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+            for (_, future), prediction in zip(items, predictions):
+                future.set_result(prediction)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'max_wait_ms': self.max_wait * 1000,
+                'max_batch_size': self.max_batch_size
+            }
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from .importacao_tardia import ModuloTardio
+
+# scipy só é importado quando um subconjunto precisa ser agrupado
+hierarchy = ModuloTardio('scipy.cluster.hierarchy')
+
+
+class MotorCorrelacoes:
+    METHODS = ('pearson', 'spearman')
+
+    def __init__(self, method='pearson', block_columns=256, chunk_rows=65_536, max_categories=50):
+        if method not in self.METHODS:
+            raise ValueError(f"Método de correlação '{method}' não suportado")
+        self.method = method
+        self.block_columns = block_columns
+        self.chunk_rows = chunk_rows
+        self.max_categories = max_categories
+
+    @staticmethod
+    def numeric_columns(df):
+        return [col for col, dtype in df.dtypes.items() if is_numeric_dtype(dtype) and not is_bool_dtype(dtype)]
+
+    @staticmethod
+    def categorical_columns(df):
+        return df.select_dtypes(include=['object', 'string', 'category', 'bool']).columns.tolist()
+
+    def _prepare(self, df, columns):
+        # Uma linha float32 por coluna, já centrada (em float64) para reduzir o erro de cancelamento
+        data = np.empty((len(columns), len(df)), dtype=np.float32)
+        constant = np.zeros(len(columns), dtype=bool)
+        for i, col in enumerate(columns):
+            values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+            if self.method == 'spearman':
+                values = pd.Series(values).rank(method='average').to_numpy()
+            valid = values[~np.isnan(values)]
+            if len(valid) == 0 or valid.min() == valid.max():
+                constant[i] = True
+                data[i] = np.nan
+                continue
+            data[i] = values - valid.mean()
+        return data, constant
+
+    def matrix(self, df, columns=None):
+        """Matriz de correlação float32 com observações completas por par, como DataFrame.corr()."""
+        columns = self.numeric_columns(df) if columns is None else list(columns)
+        data, constant = self._prepare(df, columns)
+        n_columns = len(columns)
+        has_nan = bool(np.isnan(data[~constant]).any())
+
+        # Somas acumuladas em float64 por blocos de linhas; cada produto é um GEMM float32
+        sxy = np.zeros((n_columns, n_columns))
+        if has_nan:
+            sx = np.zeros((n_columns, n_columns))
+            sxx = np.zeros((n_columns, n_columns))
+            count = np.zeros((n_columns, n_columns))
+        else:
+            sx = np.zeros(n_columns)
+            count = 0
+
+        for start in range(0, data.shape[1], self.chunk_rows):
+            chunk = data[:, start:start + self.chunk_rows]
+            if has_nan:
+                valid = ~np.isnan(chunk)
+                chunk = np.where(valid, chunk, np.float32(0))
+                mask = valid.astype(np.float32)
+                squares = chunk * chunk
+            for block in range(0, n_columns, self.block_columns):
+                rows = slice(block, block + self.block_columns)
+                sxy[rows] += chunk[rows] @ chunk.T
+                if has_nan:
+                    # Linha i, coluna j: somas de x_i e x_i² só onde x_j também é válido
+                    sx[rows] += chunk[rows] @ mask.T
+                    sxx[rows] += squares[rows] @ mask.T
+                    count[rows] += mask[rows] @ mask.T
+            if not has_nan:
+                sx += chunk.sum(axis=1, dtype=np.float64)
+                count += chunk.shape[1]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if has_nan:
+                cov = sxy - sx * sx.T / count
+                var_x = sxx - sx * sx / count
+                corr = cov / np.sqrt(var_x * var_x.T)
+                corr[count < 2] = np.nan
+            else:
+                cov = sxy - np.outer(sx, sx) / count
+                std = np.sqrt(np.diag(cov))
+                corr = cov / np.outer(std, std)
+
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[constant, :] = np.nan
+        corr[:, constant] = np.nan
+        diagonal = np.arange(n_columns)
+        corr[diagonal, diagonal] = np.where(constant, np.nan, 1.0)
+        return corr.astype(np.float32)
+
+    @staticmethod
+    def top_pairs(corr, columns, k=20, measure='pearson'):
+        """Os k pares (acima da diagonal) com maior |correlação|."""
+        upper_rows, upper_cols = np.triu_indices(len(columns), k=1)
+        values = corr[upper_rows, upper_cols]
+        strength = np.nan_to_num(np.abs(values), nan=-1.0)
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+        best = np.argpartition(-strength, k - 1)[:k]
+        best = best[np.argsort(-strength[best], kind='stable')]
+        return [
+            {'x': columns[upper_rows[i]], 'y': columns[upper_cols[i]], 'value': round(float(values[i]), 6), 'measure': measure}
+            for i in best if strength[i] >= 0
+        ]
+
+    @staticmethod
+    def clustered_subset(corr, columns, max_columns=30):
+        """Escolhe as colunas mais correlacionadas e as ordena por agrupamento hierárquico."""
+        strength = np.nan_to_num(np.abs(corr), nan=0.0)
+        np.fill_diagonal(strength, 0.0)
+        if len(columns) > max_columns:
+            keep = np.sort(np.argsort(-strength.max(axis=1), kind='stable')[:max_columns])
+        else:
+            keep = np.arange(len(columns))
+
+        if len(keep) > 2:
+            distance = 1.0 - strength[np.ix_(keep, keep)]
+            np.fill_diagonal(distance, 0.0)
+            condensed = distance[np.triu_indices(len(keep), k=1)]
+            keep = keep[hierarchy.leaves_list(hierarchy.linkage(condensed, method='average'))]
+        return [columns[i] for i in keep], corr[np.ix_(keep, keep)]
+
+    def _codes(self, series):
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        if len(uniques) < 2 or len(uniques) > self.max_categories:
+            return None, 0
+        # Desloca para que o nulo (-1) vire o grupo 0, descartado depois
+        return codes + 1, len(uniques) + 1
+
+    def associations(self, df, categorical_columns=None, numeric_columns=None):
+        """V de Cramér entre categóricas e razão de correlação (eta) entre categórica e numérica."""
+        categorical_columns = self.categorical_columns(df) if categorical_columns is None else categorical_columns
+        numeric_columns = self.numeric_columns(df) if numeric_columns is None else numeric_columns
+        encoded = {}
+        for col in categorical_columns:
+            codes, size = self._codes(df[col])
+            if codes is not None:
+                encoded[col] = (codes, size)
+
+        pairs = []
+        names = list(encoded)
+        for a, col_a in enumerate(names):
+            codes_a, size_a = encoded[col_a]
+            for col_b in names[a + 1:]:
+                codes_b, size_b = encoded[col_b]
+                table = np.bincount(codes_a * size_b + codes_b, minlength=size_a * size_b).reshape(size_a, size_b)
+                value = self._cramers_v(table[1:, 1:])
+                if value is not None:
+                    pairs.append({'x': col_a, 'y': col_b, 'value': round(value, 6), 'measure': 'cramers_v'})
+
+        for col in names:
+            codes, size = encoded[col]
+            for num_col in numeric_columns:
+                value = self._correlation_ratio(codes, size, df[num_col].to_numpy(dtype='float64', na_value=np.nan))
+                if value is not None:
+                    pairs.append({'x': col, 'y': num_col, 'value': round(value, 6), 'measure': 'eta'})
+        return pairs
+
+    @staticmethod
+    def _cramers_v(table):
+        n = table.sum()
+        rows, cols = table.sum(axis=1), table.sum(axis=0)
+        rows, cols = rows[rows > 0], cols[cols > 0]
+        table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+        if n == 0 or min(len(rows), len(cols)) < 2:
+            return None
+        expected = np.outer(rows, cols) / n
+        chi2 = ((table - expected) ** 2 / expected).sum()
+        return float(np.sqrt(chi2 / n / (min(len(rows), len(cols)) - 1)))
+
+    @staticmethod
+    def _correlation_ratio(codes, size, values):
+        valid = ~np.isnan(values) & (codes > 0)
+        if valid.sum() < 2:
+            return None
+        codes, values = codes[valid], values[valid]
+        counts = np.bincount(codes, minlength=size)
+        sums = np.bincount(codes, weights=values, minlength=size)
+        mean = values.mean()
+        total = ((values - mean) ** 2).sum()
+        if total == 0:
+            return None
+        present = counts > 0
+        between = (counts[present] * (sums[present] / counts[present] - mean) ** 2).sum()
+        return float(np.sqrt(between / total))
@@ -0,0 +1,145 @@
+import numpy as np
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+
+class MotorEstatisticas:
+    AGGREGATES = ('count', 'null_count', 'sum', 'mean', 'median', 'std', 'var', 'min', 'max',
+                  'skew', 'distinct', 'quantiles')
+    DEFAULT_AGGREGATES = ('mean', 'median', 'std', 'min', 'max')
+    SORTED_AGGREGATES = {'median', 'quantiles', 'distinct'}
+    MOMENT_AGGREGATES = {'sum', 'mean', 'std', 'var', 'skew'}
+
+    def __init__(self, aggregates=None, quantiles=(0.25, 0.5, 0.75), block_columns=64):
+        aggregates = list(aggregates or self.DEFAULT_AGGREGATES)
+        unknown = [agg for agg in aggregates if agg not in self.AGGREGATES]
+        if unknown:
+            raise ValueError(f"Agregações não suportadas: {', '.join(unknown)}")
+        self.aggregates = aggregates
+        self.quantiles = [float(q) for q in quantiles]
+        if any(q < 0 or q > 1 for q in self.quantiles):
+            raise ValueError("Quantis devem estar entre 0 e 1")
+        self.block_columns = block_columns
+        self.numeric_null_counts = {}
+
+    def compute(self, df):
+        columns = [col for col, dtype in df.dtypes.items() if is_numeric_dtype(dtype) and not is_bool_dtype(dtype)]
+        results = {}
+        self.numeric_null_counts = {}
+        # Blocos de colunas limitam as cópias temporárias a n_linhas x block_columns
+        for start in range(0, len(columns), self.block_columns):
+            block_cols = columns[start:start + self.block_columns]
+            # Uma linha contígua por coluna, copiada direto dos arrays do pandas
+            block = np.empty((len(block_cols), len(df)), dtype='float64')
+            for i, col in enumerate(block_cols):
+                block[i] = df[col].to_numpy(dtype='float64', na_value=np.nan)
+            block_stats, null_counts = self._compute_block(block)
+            for i, col in enumerate(block_cols):
+                results[col] = {agg: values[i] for agg, values in block_stats.items()}
+                self.numeric_null_counts[col] = int(null_counts[i])
+        return self._to_python(results)
+
+    def null_counts(self, df):
+        # Colunas numéricas já tiveram os nulos contados durante compute()
+        counts = {col: self.numeric_null_counts[col] for col in df.columns if col in self.numeric_null_counts}
+        remaining = [col for col in df.columns if col not in counts]
+        if remaining:
+            counts.update({col: int(n) for col, n in df[remaining].isnull().sum().items()})
+        return {col: counts[col] for col in df.columns}
+
+    def _compute_block(self, block):
+        wanted = set(self.aggregates)
+        n_rows = block.shape[1]
+        valid = ~np.isnan(block)
+        count = valid.sum(axis=1)
+        stats = {}
+
+        if 'count' in wanted:
+            stats['count'] = count
+        if 'null_count' in wanted:
+            stats['null_count'] = n_rows - count
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if wanted & self.MOMENT_AGGREGATES:
+                # Reduções com where= evitam materializar cópias sem os NaN
+                total = np.add.reduce(block, axis=1, where=valid)
+                mean = total / count
+                centered = block - mean[:, None]
+                if 'skew' in wanted:
+                    m3 = np.add.reduce(centered * centered * centered, axis=1, where=valid)
+                np.square(centered, out=centered)
+                m2 = np.add.reduce(centered, axis=1, where=valid)
+                del centered
+                var = np.where(count > 1, m2 / (count - 1), np.nan)
+                if 'sum' in wanted:
+                    stats['sum'] = total
+                if 'mean' in wanted:
+                    stats['mean'] = mean
+                if 'var' in wanted:
+                    stats['var'] = var
+                if 'std' in wanted:
+                    stats['std'] = np.sqrt(var)
+                if 'skew' in wanted:
+                    # Mesmo estimador ajustado (Fisher-Pearson) usado pelo pandas
+                    g1 = (m3 / count) / np.power(m2 / count, 1.5)
+                    skew = np.sqrt(count * (count - 1)) / (count - 2) * g1
+                    skew = np.where(m2 == 0, 0.0, skew)
+                    stats['skew'] = np.where(count > 2, skew, np.nan)
+
+            if wanted & self.SORTED_AGGREGATES and n_rows > 0:
+                # Uma única ordenação por coluna serve para mediana, quantis, min/max e distintos
+                ordered = np.sort(block, axis=1)
+                last = np.maximum(count - 1, 0)
+                has_values = count > 0
+                if 'min' in wanted:
+                    stats['min'] = np.where(has_values, ordered[:, 0], np.nan)
+                if 'max' in wanted:
+                    stats['max'] = np.where(has_values, np.take_along_axis(ordered, last[:, None], axis=1)[:, 0], np.nan)
+                if 'median' in wanted:
+                    stats['median'] = self._sorted_quantiles(ordered, count, [0.5])[:, 0]
+                if 'quantiles' in wanted:
+                    stats['quantiles'] = self._sorted_quantiles(ordered, count, self.quantiles)
+                if 'distinct' in wanted:
+                    positions = np.arange(1, n_rows)[None, :]
+                    changes = (ordered[:, 1:] != ordered[:, :-1]) & (positions < count[:, None])
+                    stats['distinct'] = np.where(has_values, changes.sum(axis=1) + 1, 0)
+            else:
+                empty = np.full(len(block), np.nan)
+                # fmin/fmax ignoram NaN e só devolvem NaN em colunas totalmente nulas
+                if 'min' in wanted:
+                    stats['min'] = np.fmin.reduce(block, axis=1) if n_rows else empty
+                if 'max' in wanted:
+                    stats['max'] = np.fmax.reduce(block, axis=1) if n_rows else empty
+                for agg in wanted & self.SORTED_AGGREGATES:
+                    stats[agg] = np.zeros(len(block), dtype=np.int64) if agg == 'distinct' else empty
+                if 'quantiles' in wanted:
+                    stats['quantiles'] = np.full((len(block), len(self.quantiles)), np.nan)
+
+        if 'quantiles' in stats:
+            quantiles = stats['quantiles']
+            stats['quantiles'] = [
+                {str(q): quantiles[i][j] for j, q in enumerate(self.quantiles)}
+                for i in range(block.shape[0])
+            ]
+        return {agg: stats[agg] for agg in self.aggregates}, n_rows - count
+
+    @staticmethod
+    def _sorted_quantiles(ordered, count, quantiles):
+        # Interpolação linear, igual ao padrão de pandas/numpy
+        positions = np.maximum(count - 1, 0)[:, None] * np.asarray(quantiles)[None, :]
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.ceil(positions).astype(np.int64)
+        low_values = np.take_along_axis(ordered, lower, axis=1)
+        high_values = np.take_along_axis(ordered, upper, axis=1)
+        result = low_values + (high_values - low_values) * (positions - lower)
+        return np.where(count[:, None] > 0, result, np.nan)
+
+    @classmethod
+    def _to_python(cls, value):
+        if isinstance(value, dict):
+            return {k: cls._to_python(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._to_python(v) for v in value]
+        if isinstance(value, (np.integer, int)) and not isinstance(value, bool):
+            return int(value)
+        value = float(value)
+        return None if np.isnan(value) or np.isinf(value) else value
@@ -0,0 +1,264 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import pandas as pd
+from .carregador_dados import CarregadorDados
+from .modelos_ml import GerenciadorModelosML
+from .visualizadorr import VisualizadorDados
+from .instrumentacao import fase
+
+
+def _report(progress, job_id, stage, value):
+    if progress is not None:
+        progress[job_id] = {'stage': stage, 'progress': value}
+
+
+def _split_target(df, target_column):
+    X = df.drop(columns=[target_column])
+    y = df[target_column]
+    if isinstance(y.dtype, pd.CategoricalDtype):
+        y = y.astype(object)
+    return X, y.fillna('Missing')
+
+
+def executar_treinamento(df, model_key, target_column, test_size=0.2, params=None,
+                         chart_format='json', binary=False, evaluation='holdout', cv_folds=5,
+                         stratified=True, n_jobs=-1, encoding='ordinal', progress=None, job_id=None):
+    _report(progress, job_id, 'preparing', 0.05)
+    X, y = _split_target(df, target_column)
+
+    gerenciador_ml = GerenciadorModelosML()
+    gerenciador_ml.prepare_data(X, y, test_size=test_size, encoding=encoding)
+    _report(progress, job_id, 'training', 0.2)
+    start = time.perf_counter()
+    gerenciador_ml.train_model(model_key, params)
+    training_time = time.perf_counter() - start
+    _report(progress, job_id, 'evaluating', 0.5)
+    metrics = gerenciador_ml.evaluate_model()
+    cross_validation = None
+    if evaluation == 'cv':
+        _report(progress, job_id, 'cross_validating', 0.6)
+        cross_validation = gerenciador_ml.cross_validate(
+            model_key, params, n_folds=cv_folds, stratified=stratified, n_jobs=n_jobs
+        )
+
+    _report(progress, job_id, 'plotting', 0.9)
+    payload = _training_payload(gerenciador_ml, metrics, training_time, chart_format, binary)
+    payload['cross_validation'] = cross_validation
+    _report(progress, job_id, 'finishing', 0.95)
+    return gerenciador_ml.finalize(), payload
+
+
+def _training_payload(gerenciador_ml, metrics, training_time, chart_format, binary):
+    with fase('figure'):
+        fig_cm = VisualizadorDados.plot_confusion_matrix(metrics['confusion_matrix'])
+        confusion_matrix_plot = VisualizadorDados.figure_to_payload(fig_cm, chart_format, binary)
+        feature_importance_plot = None
+        importance_df = gerenciador_ml.get_feature_importance()
+        if importance_df is not None:
+            fig_importance = VisualizadorDados.plot_feature_importance(importance_df)
+            feature_importance_plot = VisualizadorDados.figure_to_payload(fig_importance, chart_format, binary)
+
+    return {
+        'accuracy': metrics['accuracy'],
+        'precision': metrics['precision'],
+        'recall': metrics['recall'],
+        'f1_score': metrics['f1_score'],
+        'train_accuracy': metrics['train_accuracy'],
+        'training_time': training_time,
+        'confusion_matrix': metrics['confusion_matrix'],
+        'classification_report': metrics['classification_report'],
+        'confusion_matrix_plot': confusion_matrix_plot,
+        'feature_importance_plot': feature_importance_plot
+    }
+
+
+def executar_treinamento_streaming(path, model_key, target_column, file_format='csv', test_size=0.2,
+                                   params=None, chart_format='json', binary=False, chunk_rows=100_000,
+                                   epochs=1, max_holdout_rows=50_000, encoding='ordinal', remove_file=True,
+                                   progress=None, job_id=None):
+    # Só um bloco, a amostra de ajuste e o conjunto de teste ficam em memória ao mesmo tempo
+    def chunks():
+        with open(path, 'rb') as file:
+            yield from CarregadorDados.iter_chunks(file, file_format, chunk_rows)
+
+    try:
+        _report(progress, job_id, 'scanning', 0.02)
+        gerenciador_ml = GerenciadorModelosML()
+        start = time.perf_counter()
+        summary = gerenciador_ml.train_streaming(
+            chunks, target_column, model_key, params, test_size=test_size, max_holdout_rows=max_holdout_rows,
+            epochs=epochs, encoding=encoding,
+            progress_callback=lambda value: _report(progress, job_id, 'training', 0.1 + 0.75 * value)
+        )
+        training_time = time.perf_counter() - start
+    finally:
+        if remove_file:
+            os.remove(path)
+
+    _report(progress, job_id, 'evaluating', 0.85)
+    metrics = gerenciador_ml.evaluate_model()
+    _report(progress, job_id, 'plotting', 0.9)
+    payload = _training_payload(gerenciador_ml, metrics, training_time, chart_format, binary)
+    # Acurácia de treino medida na amostra de ajuste, não no arquivo inteiro
+    payload['streaming'] = summary
+    _report(progress, job_id, 'finishing', 0.95)
+    return gerenciador_ml.finalize(), payload
+
+
+def executar_busca(df, model_key, target_column, test_size=0.2, strategy='random', n_trials=20,
+                   n_jobs=-1, refit=True, encoding='ordinal', progress=None, job_id=None):
+    _report(progress, job_id, 'preparing', 0.0)
+    X, y = _split_target(df, target_column)
+
+    gerenciador_ml = GerenciadorModelosML()
+    gerenciador_ml.prepare_data(X, y, test_size=test_size, encoding=encoding)
+    with fase('tune'):
+        results = gerenciador_ml.tune(
+            model_key, strategy=strategy, n_trials=n_trials, n_jobs=n_jobs,
+            progress_callback=lambda value: _report(progress, job_id, 'searching', 0.9 * value)
+        )
+    if not refit:
+        return None, results
+
+    _report(progress, job_id, 'refitting', 0.9)
+    start = time.perf_counter()
+    gerenciador_ml.train_model(model_key, results['best_params'])
+    training_time = time.perf_counter() - start
+    metrics = gerenciador_ml.evaluate_model()
+    results['metrics'] = {k: v for k, v in metrics.items() if k != 'classification_report'}
+    results['metrics']['training_time'] = training_time
+    return gerenciador_ml.finalize(), results
+
+
+class FilaTreinamento:
+    def __init__(self, max_workers=2, max_jobs=256, on_complete=None):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.on_complete = on_complete
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._progress = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            # spawn evita herdar o estado das threads do servidor via fork
+            context = multiprocessing.get_context('spawn')
+            self._manager = context.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def submit(self, fn, *args, temp_files=(), **kwargs):
+        # temp_files: arquivos do job apagados ao terminar, inclusive se ele for cancelado ainda na fila
+        job_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._ensure_started()
+            # Antes de inserir: o job novo ainda não tem future e não pode ser confundido com um encerrado
+            self._evict(incoming=1)
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'stage': 'queued',
+                'progress': 0.0,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'finished_at': None,
+                'result': None,
+                'error': None,
+                'future': None,
+                'temp_files': list(temp_files)
+            }
+            try:
+                future = self._executor.submit(fn, *args, progress=self._progress, job_id=job_id, **kwargs)
+            except Exception:
+                self._remove_files(self._jobs.pop(job_id)['temp_files'])
+                raise
+            self._jobs[job_id]['future'] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return job_id
+
+    def _finish(self, job_id, future):
+        result, error = None, None
+        if future.cancelled():
+            status = 'cancelled'
+        elif future.exception() is not None:
+            status, error = 'failed', str(future.exception())
+        else:
+            status = 'done'
+            try:
+                result = self.on_complete(future.result()) if self.on_complete else future.result()
+            except Exception as e:
+                status, error = 'failed', str(e)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update({
+                'status': status,
+                'stage': status,
+                'progress': 1.0 if status == 'done' else job['progress'],
+                'finished_at': datetime.now(timezone.utc).isoformat(),
+                'result': result,
+                'error': error,
+                'future': None
+            })
+            self._progress.pop(job_id, None)
+            temp_files, job['temp_files'] = job['temp_files'], []
+        self._remove_files(temp_files)
+
+    @staticmethod
+    def _remove_files(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # O próprio job já apagou
+                pass
+
+    FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+    def _evict(self, incoming=0):
+        # Só jobs encerrados saem; com todos em andamento a tabela passa temporariamente de max_jobs
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in self.FINISHED_STATUSES]
+        while len(self._jobs) + incoming > self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0), None)
+
+    def status(self, job_id, include_result=True):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        future = job.pop('future')
+        job.pop('temp_files', None)
+        if future is not None:
+            reported = self._progress.get(job_id)
+            if reported:
+                job.update(reported)
+                job['status'] = 'running'
+        if not include_result:
+            job.pop('result')
+        return job
+
+    def list(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.status(job_id, include_result=False) for job_id in job_ids]
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = job and job['future']
+        return bool(future and future.cancel())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
@@ -0,0 +1,55 @@
+import importlib
+import threading
+
+# Módulos caros de importar que só algumas rotas usam
+MODULOS_PESADOS = (
+    'sklearn.metrics',
+    'sklearn.model_selection',
+    'sklearn.preprocessing',
+    'sklearn.ensemble',
+    'sklearn.tree',
+    'sklearn.neighbors',
+    'sklearn.linear_model',
+    'plotly.express',
+    'plotly.graph_objects',
+    'plotly.io.json',
+    'scipy.cluster.hierarchy',
+)
+
+
+class ModuloTardio:
+    """Importa o módulo de verdade só no primeiro acesso a um atributo."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'carregado' if self._module is not None else 'pendente'
+        return f'<ModuloTardio {self._name} ({state})>'
+
+
+def carregar_atributo(module_name, attr):
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def preaquecer_modulos(modules=MODULOS_PESADOS):
+    # Importa em segundo plano para que a primeira requisição não pague o custo
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=run, name='preaquecer-modulos', daemon=True)
+    thread.start()
+    return thread
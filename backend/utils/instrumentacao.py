@@ -0,0 +1,157 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import sys
+import threading
+import time
+
+# Fases medidas na requisição atual; None fora de uma requisição (ex.: processos de treino)
+_fases_atuais = ContextVar('fases_atuais', default=None)
+
+
+class MedidorFases:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.order = []
+
+    def add(self, name, seconds):
+        if name not in self.phases:
+            self.order.append(name)
+        self.phases[name] += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total=None):
+        # Formato do cabeçalho Server-Timing: nome;dur=milissegundos
+        entries = [f'{name};dur={self.phases[name] * 1000:.2f}' for name in self.order]
+        entries.append(f'total;dur={(self.elapsed() if total is None else total) * 1000:.2f}')
+        return ', '.join(entries)
+
+
+def iniciar_medicao():
+    medidor = MedidorFases()
+    return medidor, _fases_atuais.set(medidor)
+
+
+def encerrar_medicao(token):
+    _fases_atuais.reset(token)
+
+
+@contextmanager
+def fase(name):
+    medidor = _fases_atuais.get()
+    if medidor is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        medidor.add(name, time.perf_counter() - start)
+
+
+class MetricasPrometheus:
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._bytes = defaultdict(int)
+        self._duration_buckets = defaultdict(lambda: [0] * len(self.BUCKETS))
+        self._duration_sum = defaultdict(float)
+        self._duration_count = defaultdict(int)
+        self._phase_sum = defaultdict(float)
+        self._phase_count = defaultdict(int)
+
+    def observe(self, endpoint, method, status, seconds, phases, response_bytes=0):
+        with self._lock:
+            self._requests[(endpoint, method, str(status))] += 1
+            self._bytes[endpoint] += response_bytes
+            buckets = self._duration_buckets[endpoint]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self._duration_sum[endpoint] += seconds
+            self._duration_count[endpoint] += 1
+            for phase_name, phase_seconds in phases.items():
+                self._phase_sum[(endpoint, phase_name)] += phase_seconds
+                self._phase_count[(endpoint, phase_name)] += 1
+
+    @staticmethod
+    def _labels(**labels):
+        escaped = (
+            '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for k, v in labels.items()
+        )
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self, gauges=None):
+        lines = []
+        with self._lock:
+            lines += ['# HELP http_requests_total Requisições atendidas', '# TYPE http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{self._labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+            lines += ['# HELP http_response_bytes_total Bytes enviados nas respostas',
+                      '# TYPE http_response_bytes_total counter']
+            for endpoint, total in sorted(self._bytes.items()):
+                lines.append(f'http_response_bytes_total{self._labels(endpoint=endpoint)} {total}')
+
+            lines += ['# HELP http_request_duration_seconds Latência por endpoint',
+                      '# TYPE http_request_duration_seconds histogram']
+            for endpoint, buckets in sorted(self._duration_buckets.items()):
+                for bound, count in zip(self.BUCKETS, buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{self._labels(endpoint=endpoint, le=bound)} {count}')
+                count = self._duration_count[endpoint]
+                lines.append(f'http_request_duration_seconds_bucket{self._labels(endpoint=endpoint, le="+Inf")} {count}')
+                lines.append(f'http_request_duration_seconds_sum{self._labels(endpoint=endpoint)} {self._duration_sum[endpoint]}')
+                lines.append(f'http_request_duration_seconds_count{self._labels(endpoint=endpoint)} {count}')
+
+            lines += ['# HELP request_phase_seconds Tempo gasto em cada fase da requisição',
+                      '# TYPE request_phase_seconds summary']
+            for (endpoint, phase_name), total in sorted(self._phase_sum.items()):
+                labels = self._labels(endpoint=endpoint, phase=phase_name)
+                lines.append(f'request_phase_seconds_sum{labels} {total}')
+                lines.append(f'request_phase_seconds_count{labels} {self._phase_count[(endpoint, phase_name)]}')
+
+        for name, (help_text, value) in sorted((gauges or {}).items()):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+class AmostradorPilhas:
+    """Amostra a pilha de uma thread e grava no formato "collapsed" (o mesmo do py-spy --format raw)."""
+
+    def __init__(self, thread_id=None, interval=0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='amostrador-pilhas', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{frame.f_lineno})')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, 'w') as output:
+            for stack, count in sorted(self.samples.items()):
+                output.write(f'{stack} {count}\n')
@@ -1,27 +1,91 @@
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    confusion_matrix,
-    classification_report
-)
+from itertools import product
+import time
+import numpy as np
 import pandas as pd
 import joblib
+from joblib import Parallel, delayed
+from .arvores_compiladas import FlorestaCompilada
+from .codificador_categorico import CodificadorCategorico
+from .importacao_tardia import ModuloTardio, carregar_atributo
+from .instrumentacao import fase
+
+# sklearn só é importado quando um modelo é de fato treinado ou avaliado
+sk_metrics = ModuloTardio('sklearn.metrics')
+model_selection = ModuloTardio('sklearn.model_selection')
+preprocessing = ModuloTardio('sklearn.preprocessing')
+
+
+def _encoded_split(X, y, fit_idx, val_idx, encoding=None):
+    if encoding is None:
+        return X[fit_idx], X[val_idx]
+    # X bruto: o codificador é ajustado só nas linhas de ajuste, então a codificação por alvo
+    # nunca vê os rótulos que vai ser avaliada
+    encoder = CodificadorCategorico(strategy=encoding).fit(X.iloc[fit_idx], y[fit_idx])
+    return encoder.transform(X.iloc[fit_idx]), encoder.transform(X.iloc[val_idx])
+
+
+def _run_trial(model_class, params, X, y, fit_idx, val_idx, trial_id, n_samples=None, encoding=None):
+    if n_samples is not None:
+        fit_idx = fit_idx[:n_samples]
+    X_fit, X_val = _encoded_split(X, y, fit_idx, val_idx, encoding)
+    y_fit, y_val = y[fit_idx], y[val_idx]
+    model = model_class(**params)
+    start = time.perf_counter()
+    model.fit(X_fit, y_fit)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(X_val)
+    predict_time = time.perf_counter() - start
+    return {
+        'trial': trial_id,
+        'params': params,
+        'n_samples': len(y_fit),
+        'score': sk_metrics.accuracy_score(y_val, y_pred),
+        'f1_score': sk_metrics.f1_score(y_val, y_pred, average='weighted', zero_division=0),
+        'fit_time': fit_time,
+        'predict_time': predict_time
+    }
+
+
+def _run_fold(model_class, params, X, y, train_idx, test_idx, fold_id, encoding=None):
+    X_train, X_test = _encoded_split(X, y, train_idx, test_idx, encoding)
+    model = model_class(**params)
+    start = time.perf_counter()
+    model.fit(X_train, y[train_idx])
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+    y_true = y[test_idx]
+    return {
+        'fold': fold_id,
+        'n_train': len(train_idx),
+        'n_test': len(test_idx),
+        'accuracy': sk_metrics.accuracy_score(y_true, y_pred),
+        'precision': sk_metrics.precision_score(y_true, y_pred, average='weighted', zero_division=0),
+        'recall': sk_metrics.recall_score(y_true, y_pred, average='weighted', zero_division=0),
+        'f1_score': sk_metrics.f1_score(y_true, y_pred, average='weighted', zero_division=0),
+        'fit_time': fit_time,
+        'predict_time': predict_time
+    }
 
 
 class GerenciadorModelosML:
     MODELS = {
-        'Random Forest': RandomForestClassifier,
-        'Decision Tree': DecisionTreeClassifier,
-        'K-Nearest Neighbors': KNeighborsClassifier,
-        'Logistic Regression': LogisticRegression
+        'Random Forest': ('sklearn.ensemble', 'RandomForestClassifier'),
+        'Decision Tree': ('sklearn.tree', 'DecisionTreeClassifier'),
+        'K-Nearest Neighbors': (f'{__package__}.vizinhos_indexados', 'ClassificadorKNNIndexado'),
+        'Logistic Regression': ('sklearn.linear_model', 'LogisticRegression'),
+        'SGD Logistic Regression': ('sklearn.linear_model', 'SGDClassifier'),
+        'Naive Bayes': ('sklearn.naive_bayes', 'GaussianNB')
+    }
+
+    # Modelos com partial_fit, usados no treino fora da memória
+    INCREMENTAL_MODELS = ('SGD Logistic Regression', 'Naive Bayes')
+
+    # Parâmetros aplicados antes dos enviados pelo usuário
+    MODEL_DEFAULTS = {
+        'SGD Logistic Regression': {'loss': 'log_loss', 'random_state': 42}
     }
 
     MODEL_PARAMS = {
@@ -38,96 +102,450 @@ class GerenciadorModelosML:
         'K-Nearest Neighbors': {
             'n_neighbors': {'type': 'slider', 'min': 1, 'max': 30, 'default': 5, 'step': 1},
             'weights': {'type': 'select', 'options': ['uniform', 'distance'], 'default': 'uniform'},
-            'metric': {'type': 'select', 'options': ['euclidean', 'manhattan', 'minkowski'], 'default': 'euclidean'}
+            'metric': {'type': 'select', 'options': ['euclidean', 'manhattan', 'minkowski'], 'default': 'euclidean'},
+            'index': {'type': 'select', 'options': ['auto', 'exact', 'ivf'], 'default': 'auto'},
+            # Listas sondadas por consulta no índice aproximado: mais listas, mais recall e mais tempo
+            'n_probe': {'type': 'slider', 'min': 1, 'max': 64, 'default': 16, 'step': 1}
         },
         'Logistic Regression': {
             'C': {'type': 'slider', 'min': 0.1, 'max': 10.0, 'default': 1.0, 'step': 0.1},
             'max_iter': {'type': 'slider', 'min': 100, 'max': 1000, 'default': 100, 'step': 100}
+        },
+        'SGD Logistic Regression': {
+            'loss': {'type': 'select', 'options': ['log_loss', 'modified_huber', 'hinge'], 'default': 'log_loss'},
+            'alpha': {'type': 'select', 'options': [0.00001, 0.0001, 0.001, 0.01], 'default': 0.0001}
+        },
+        'Naive Bayes': {
+            'var_smoothing': {'type': 'select', 'options': [1e-9, 1e-7, 1e-5, 1e-3], 'default': 1e-9}
         }
     }
 
+    # Acima disso o predict em Cython do sklearn supera a travessia vetorizada das árvores compiladas
+    COMPILED_MAX_ROWS = 256
+
+    @classmethod
+    def model_class(cls, model_name):
+        if model_name not in cls.MODELS:
+            raise ValueError(f"Modelo '{model_name}' não disponível")
+        return carregar_atributo(*cls.MODELS[model_name])
+
+    @classmethod
+    def model_params(cls, model_name, params=None):
+        return {**cls.MODEL_DEFAULTS.get(model_name, {}), **(params or {})}
+
     def __init__(self):
         self.model = None
+        self.compiled = None
         self.model_name = None
         self.X_train = None
         self.X_test = None
         self.y_train = None
         self.y_test = None
+        # DataFrame antes da codificação e índices da divisão, para tune/cross_validate recodificarem por fold
+        self.X_raw = None
+        self.train_idx = None
+        self.test_idx = None
         self.feature_names = None
-        self.encoders = {}
+        self.preprocessor = None
         self.label_encoder = None
 
-    def prepare_data(self, X, y, test_size=0.2, random_state=42):
-        X = X.copy()
-        self.feature_names = X.columns.tolist() if isinstance(X, pd.DataFrame) else None
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError("Modelo finalizado não pode ser alterado")
+        super().__setattr__(name, value)
 
-        # Encode categorical features
-        for col in X.select_dtypes(include=['object', 'string']).columns:
-            le = LabelEncoder()
-            X[col] = le.fit_transform(X[col].astype(str))
-            self.encoders[col] = le
+    def finalize(self):
+        # Libera os dados de treino e torna o estado do modelo somente leitura
+        if self.model is None and self.compiled is None:
+            raise ValueError("Modelo não treinado")
+        self.X_train = None
+        self.X_test = None
+        self.y_train = None
+        self.y_test = None
+        self.X_raw = None
+        self.train_idx = None
+        self.test_idx = None
+        self._frozen = True
+        return self
+
+    def prepare_data(self, X, y, test_size=0.2, random_state=42, encoding='ordinal'):
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X)
+        self.feature_names = X.columns.tolist()
 
         # Encode target
-        self.label_encoder = LabelEncoder()
+        self.label_encoder = preprocessing.LabelEncoder()
         y = self.label_encoder.fit_transform(y.astype(str))
 
-        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state
+        train_idx, test_idx = model_selection.train_test_split(
+            np.arange(len(X)), test_size=test_size, random_state=random_state
         )
+        # O codificador é ajustado só no treino para a codificação por alvo não vazar o teste
+        with fase('encode'):
+            self.preprocessor = CodificadorCategorico(strategy=encoding)
+            self.preprocessor.fit(X.iloc[train_idx], y[train_idx])
+            self.X_train = self.preprocessor.transform(X.iloc[train_idx])
+            self.X_test = self.preprocessor.transform(X.iloc[test_idx])
+        self.y_train, self.y_test = y[train_idx], y[test_idx]
+        self.X_raw, self.train_idx, self.test_idx = X, train_idx, test_idx
         return self.X_train, self.X_test, self.y_train, self.y_test
 
+    def _validation_data(self, include_test=False):
+        # Codificações que usam o alvo precisam ser ajustadas dentro de cada fold/trial; as demais
+        # reaproveitam a matriz já codificada, compartilhada via memmap entre os processos do joblib
+        if include_test:
+            y = np.concatenate([self.y_train, self.y_test])
+        else:
+            y = np.asarray(self.y_train)
+        if self.preprocessor is None or self.preprocessor.strategy != 'target':
+            X = np.concatenate([self.X_train, self.X_test]) if include_test else self.X_train
+            return np.ascontiguousarray(X, dtype=np.float64), y, None
+        if self.X_raw is None:
+            raise ValueError("Codificação por alvo exige os dados de prepare_data() para validar sem vazamento")
+        rows = np.concatenate([self.train_idx, self.test_idx]) if include_test else self.train_idx
+        return self.X_raw.iloc[rows].reset_index(drop=True), y, self.preprocessor.strategy
+
     def train_model(self, model_name, params=None):
         if model_name not in self.MODELS:
             raise ValueError(f"Modelo '{model_name}' não disponível")
         if self.X_train is None or self.y_train is None:
             raise ValueError("Dados não preparados. Execute prepare_data() primeiro")
         
-        params = params or {}
-        model_class = self.MODELS[model_name]
+        params = self.model_params(model_name, params)
+        model_class = self.model_class(model_name)
         self.model = model_class(**params)
         self.model_name = model_name
-        self.model.fit(self.X_train, self.y_train)
+        with fase('fit'):
+            self.model.fit(self.X_train, self.y_train)
+        self.compiled = None
+        if FlorestaCompilada.supports(self.model):
+            with fase('compile'):
+                self.compiled = FlorestaCompilada.from_estimator(self.model)
         return self.model
 
+    def _predict_encoded(self, X):
+        # Lotes pequenos vão para as árvores compiladas; os grandes, para o sklearn quando o modelo foi mantido
+        if self.compiled is not None and (self.model is None or len(X) <= self.COMPILED_MAX_ROWS):
+            return self.compiled.predict(X)
+        return self.model.predict(X)
+
+    def train_streaming(self, chunks, target_column, model_name, params=None, test_size=0.2,
+                        max_holdout_rows=50_000, fit_rows=50_000, epochs=1, encoding='ordinal',
+                        random_state=42, progress_callback=None):
+        """Treina fora da memória com partial_fit.
+
+        chunks é uma função que devolve um iterador novo de DataFrames a cada chamada. A primeira
+        passada sorteia por reservatório o conjunto de teste e a amostra usada para ajustar o
+        codificador e a escala; as seguintes treinam bloco a bloco, pulando as linhas de teste.
+        """
+        if model_name not in self.MODELS:
+            raise ValueError(f"Modelo '{model_name}' não disponível")
+        if model_name not in self.INCREMENTAL_MODELS:
+            raise ValueError(f"Modelo '{model_name}' não suporta treino incremental")
+        model_class = self.model_class(model_name)
+
+        rng = np.random.default_rng(random_state)
+        with fase('scan'):
+            sample, sample_keys, sample_index, classes, n_rows = self._scan_stream(
+                chunks, target_column, max_holdout_rows + fit_rows, rng
+            )
+        if n_rows < 2 or len(classes) < 2:
+            raise ValueError("São necessárias ao menos 2 linhas e 2 classes para treinar")
+
+        # Chaves aleatórias: as menores formam o teste, as seguintes a amostra de ajuste
+        order = np.argsort(sample_keys, kind='stable')
+        n_holdout = max(1, min(max_holdout_rows, int(round(n_rows * test_size))))
+        holdout_pos, fit_pos = order[:n_holdout], order[n_holdout:]
+        holdout_index = np.sort(sample_index[holdout_pos])
+
+        self.label_encoder = preprocessing.LabelEncoder().fit(np.array(sorted(classes), dtype=object))
+        X_sample, y_sample = self._split_stream_chunk(sample, target_column)
+        y_sample = self.label_encoder.transform(y_sample)
+        self.feature_names = X_sample.columns.tolist()
+        fit_rows_df = X_sample.iloc[fit_pos] if len(fit_pos) else X_sample.iloc[holdout_pos]
+        fit_y = y_sample[fit_pos] if len(fit_pos) else y_sample[holdout_pos]
+        with fase('encode'):
+            # Codificação estável: ajustada uma vez na amostra e só aplicada nos blocos
+            self.preprocessor = CodificadorCategorico(strategy=encoding).fit(fit_rows_df, fit_y)
+            self.X_train = self.preprocessor.transform(fit_rows_df)
+            self.X_test = self.preprocessor.transform(X_sample.iloc[holdout_pos])
+        self.y_train, self.y_test = fit_y, y_sample[holdout_pos]
+        scaler = preprocessing.StandardScaler().fit(self.X_train)
+
+        estimator = model_class(**self.model_params(model_name, params))
+        all_classes = np.arange(len(self.label_encoder.classes_))
+        total_rows, seen_rows = (n_rows - n_holdout) * epochs, 0
+        with fase('fit'):
+            for _ in range(epochs):
+                offset = 0
+                for chunk in chunks():
+                    index = np.arange(offset, offset + len(chunk))
+                    offset += len(chunk)
+                    keep = ~np.isin(index, holdout_index, assume_unique=True)
+                    if not keep.any():
+                        continue
+                    X_chunk, y_chunk = self._split_stream_chunk(chunk[keep], target_column)
+                    X_chunk = scaler.transform(self.preprocessor.transform(X_chunk))
+                    y_chunk = self.label_encoder.transform(y_chunk)
+                    # Embaralha dentro do bloco: arquivos costumam vir ordenados (ex.: por data)
+                    perm = rng.permutation(len(y_chunk))
+                    estimator.partial_fit(X_chunk[perm], y_chunk[perm], classes=all_classes)
+                    seen_rows += len(y_chunk)
+                    if progress_callback:
+                        progress_callback(min(seen_rows / max(total_rows, 1), 1.0))
+
+        # A escala fica dentro do modelo para que predict/predict_records continuem iguais
+        self.model = carregar_atributo('sklearn.pipeline', 'Pipeline')([('scale', scaler), ('model', estimator)])
+        self.compiled = None
+        self.model_name = model_name
+        return {'n_rows': n_rows, 'n_train': n_rows - n_holdout, 'n_test': n_holdout, 'epochs': epochs,
+                'n_classes': len(all_classes)}
+
+    def _scan_stream(self, chunks, target_column, capacity, rng):
+        # Amostragem bottom-k: equivale a um reservatório, e linhas acima do limiar nem são copiadas
+        sample, sample_keys, sample_index = None, np.empty(0), np.empty(0, dtype=np.int64)
+        classes, n_rows = set(), 0
+        for chunk in chunks():
+            if target_column not in chunk.columns:
+                raise ValueError("Coluna alvo não encontrada")
+            classes.update(pd.unique(self._split_stream_chunk(chunk[[target_column]], target_column)[1]))
+            keys = rng.random(len(chunk))
+            index = np.arange(n_rows, n_rows + len(chunk))
+            n_rows += len(chunk)
+            if len(sample_keys) >= capacity:
+                candidates = keys < sample_keys.max()
+                if not candidates.any():
+                    continue
+                chunk, keys, index = chunk[candidates], keys[candidates], index[candidates]
+            chunk = chunk.reset_index(drop=True)
+            sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+            sample_keys = np.concatenate([sample_keys, keys])
+            sample_index = np.concatenate([sample_index, index])
+            if len(sample_keys) > capacity:
+                keep = np.sort(np.argpartition(sample_keys, capacity)[:capacity])
+                sample = sample.iloc[keep].reset_index(drop=True)
+                sample_keys, sample_index = sample_keys[keep], sample_index[keep]
+        if sample is None:
+            raise ValueError("Arquivo sem linhas")
+        return sample, sample_keys, sample_index, classes, n_rows
+
+    def _split_stream_chunk(self, chunk, target_column):
+        # Mesmo tratamento do alvo que o treino em memória: nulos viram 'Missing', rótulos viram texto
+        y = chunk[target_column]
+        if y.dtype.kind == 'f' and (y.dropna() % 1 == 0).all():
+            # Um bloco com nulos lê inteiros como float; sem isso '1' e '1.0' virariam classes diferentes
+            y = y.astype('Int64')
+        y = y.astype(object).where(y.notna(), 'Missing').astype(str)
+        X = chunk.drop(columns=[target_column])
+        if self.preprocessor is not None:
+            # Blocos podem inferir tipos diferentes: colunas numéricas no ajuste continuam numéricas
+            numeric = [col for col in self.preprocessor.columns
+                       if col not in self.preprocessor.encodings and X[col].dtype == object]
+            if numeric:
+                X = X.assign(**{col: pd.to_numeric(X[col], errors='coerce') for col in numeric})
+        return X, y.to_numpy()
+
+    def _param_values(self, model_name, grid_points=None):
+        space = {}
+        for name, spec in self.MODEL_PARAMS[model_name].items():
+            if spec['type'] == 'select':
+                space[name] = list(spec['options'])
+                continue
+            is_int = all(float(spec[k]).is_integer() for k in ('min', 'max', 'step'))
+            n_steps = int(round((spec['max'] - spec['min']) / spec['step']))
+            values = [spec['min'] + i * spec['step'] for i in range(n_steps + 1)]
+            values = [int(round(v)) if is_int else round(v, 10) for v in values]
+            if grid_points and len(values) > grid_points:
+                idx = np.unique(np.linspace(0, len(values) - 1, grid_points).round().astype(int))
+                values = [values[i] for i in idx]
+            space[name] = values
+        return space
+
+    def _candidates(self, model_name, strategy, n_trials, grid_points, random_state):
+        if strategy == 'grid':
+            space = self._param_values(model_name, grid_points)
+            names = list(space)
+            return [dict(zip(names, combo)) for combo in product(*(space[n] for n in names))]
+
+        space = self._param_values(model_name)
+        rng = np.random.default_rng(random_state)
+        total = int(np.prod([len(v) for v in space.values()]))
+        candidates, seen = [], set()
+        while len(candidates) < min(n_trials, total):
+            params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+            key = tuple(sorted(params.items()))
+            if key not in seen:
+                seen.add(key)
+                candidates.append(params)
+        return candidates
+
+    def tune(self, model_name, strategy='random', n_trials=20, n_jobs=-1, grid_points=4,
+             halving_factor=3, validation_size=0.2, random_state=42, progress_callback=None):
+        if model_name not in self.MODELS:
+            raise ValueError(f"Modelo '{model_name}' não disponível")
+        if self.X_train is None or self.y_train is None:
+            raise ValueError("Dados não preparados. Execute prepare_data() primeiro")
+        if strategy not in ('grid', 'random', 'halving'):
+            raise ValueError(f"Estratégia '{strategy}' não suportada")
+
+        X, y, encoding = self._validation_data()
+        fit_idx, val_idx = model_selection.train_test_split(
+            np.arange(len(y)), test_size=validation_size, random_state=random_state
+        )
+        y_fit = y[fit_idx]
+        candidates = self._candidates(model_name, strategy, n_trials, grid_points, random_state)
+        model_class = self.model_class(model_name)
+        start = time.perf_counter()
+
+        if strategy == 'halving':
+            n_rounds = max(1, int(np.ceil(np.log(len(candidates)) / np.log(halving_factor))) + 1)
+            n_samples = max(len(np.unique(y_fit)) * 2, len(y_fit) // halving_factor ** (n_rounds - 1))
+        else:
+            n_rounds, n_samples = 1, len(y_fit)
+
+        total_trials = sum(
+            max(1, len(candidates) // halving_factor ** r) for r in range(n_rounds)
+        ) if strategy == 'halving' else len(candidates)
+        leaderboard, done = [], 0
+        with Parallel(n_jobs=n_jobs, backend='loky', return_as='generator_unordered') as parallel:
+            for round_id in range(n_rounds):
+                results = parallel(
+                    delayed(_run_trial)(model_class, self.model_params(model_name, params), X, y, fit_idx, val_idx,
+                                        len(leaderboard) + i, min(n_samples, len(y_fit)), encoding)
+                    for i, params in enumerate(candidates)
+                )
+                round_results = []
+                for result in results:
+                    result['round'] = round_id
+                    round_results.append(result)
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done / total_trials)
+                leaderboard.extend(round_results)
+                if round_id == n_rounds - 1 or len(candidates) <= 1:
+                    break
+                round_results.sort(key=lambda r: r['score'], reverse=True)
+                keep = max(1, len(candidates) // halving_factor)
+                candidates = [r['params'] for r in round_results[:keep]]
+                n_samples *= halving_factor
+
+        # Só a rodada final (maior orçamento) de cada configuração entra no ranking
+        final = {}
+        for result in leaderboard:
+            key = tuple(sorted(result['params'].items()))
+            if key not in final or result['round'] > final[key]['round']:
+                final[key] = result
+        ranked = sorted(final.values(), key=lambda r: (r['round'], r['score']), reverse=True)
+        for rank, result in enumerate(ranked, start=1):
+            result['rank'] = rank
+
+        return {
+            'model_name': model_name,
+            'strategy': strategy,
+            'n_trials': len(leaderboard),
+            'best_params': ranked[0]['params'],
+            'best_score': ranked[0]['score'],
+            'total_time': time.perf_counter() - start,
+            'leaderboard': ranked,
+            'trials': sorted(leaderboard, key=lambda r: r['trial'])
+        }
+
+    def cross_validate(self, model_name, params=None, n_folds=5, stratified=True, n_jobs=-1,
+                       random_state=42):
+        if model_name not in self.MODELS:
+            raise ValueError(f"Modelo '{model_name}' não disponível")
+        if self.X_train is None or self.y_train is None:
+            raise ValueError("Dados não preparados. Execute prepare_data() primeiro")
+        if n_folds < 2:
+            raise ValueError("São necessários pelo menos 2 folds")
+
+        # Validação cruzada sobre todos os dados preparados (treino + teste)
+        X, y, encoding = self._validation_data(include_test=True)
+        if n_folds > len(y):
+            raise ValueError("Número de folds maior que o número de linhas")
+
+        # Estratificação exige ao menos n_folds exemplos na menor classe
+        stratified = stratified and np.bincount(y).min() >= n_folds
+        splitter_class = model_selection.StratifiedKFold if stratified else model_selection.KFold
+        splitter = splitter_class(n_splits=n_folds, shuffle=True, random_state=random_state)
+        model_class = self.model_class(model_name)
+        params = self.model_params(model_name, params)
+
+        start = time.perf_counter()
+        with fase('cross_validate'):
+            folds = Parallel(n_jobs=n_jobs, backend='loky')(
+                delayed(_run_fold)(model_class, params, X, y, train_idx, test_idx, fold_id, encoding)
+                for fold_id, (train_idx, test_idx) in enumerate(splitter.split(np.zeros(len(y)), y))
+            )
+        total_time = time.perf_counter() - start
+
+        summary = {}
+        for metric in ('accuracy', 'precision', 'recall', 'f1_score', 'fit_time', 'predict_time'):
+            values = np.array([fold[metric] for fold in folds])
+            summary[metric] = {'mean': float(values.mean()), 'std': float(values.std())}
+        return {
+            'model_name': model_name,
+            'n_folds': n_folds,
+            'stratified': bool(stratified),
+            'folds': folds,
+            'summary': summary,
+            'total_time': total_time
+        }
+
     def evaluate_model(self):
-        if self.model is None:
+        if self.model is None and self.compiled is None:
             raise ValueError("Modelo não treinado")
 
-        y_train_pred = self.model.predict(self.X_train)
-        y_test_pred = self.model.predict(self.X_test)
-
-        metrics = {
-            'train_accuracy': accuracy_score(self.y_train, y_train_pred),
-            'accuracy': accuracy_score(self.y_test, y_test_pred),
-            'precision': precision_score(self.y_test, y_test_pred, average='weighted', zero_division=0),
-            'recall': recall_score(self.y_test, y_test_pred, average='weighted', zero_division=0),
-            'f1_score': f1_score(self.y_test, y_test_pred, average='weighted', zero_division=0),
-            'confusion_matrix': confusion_matrix(self.y_test, y_test_pred).tolist(),
-            'classification_report': classification_report(self.y_test, y_test_pred, zero_division=0)
-        }
+        with fase('evaluate'):
+            y_train_pred = self._predict_encoded(self.X_train)
+            y_test_pred = self._predict_encoded(self.X_test)
+
+            metrics = {
+                'train_accuracy': sk_metrics.accuracy_score(self.y_train, y_train_pred),
+                'accuracy': sk_metrics.accuracy_score(self.y_test, y_test_pred),
+                'precision': sk_metrics.precision_score(self.y_test, y_test_pred, average='weighted', zero_division=0),
+                'recall': sk_metrics.recall_score(self.y_test, y_test_pred, average='weighted', zero_division=0),
+                'f1_score': sk_metrics.f1_score(self.y_test, y_test_pred, average='weighted', zero_division=0),
+                'confusion_matrix': sk_metrics.confusion_matrix(self.y_test, y_test_pred).tolist(),
+                'classification_report': sk_metrics.classification_report(self.y_test, y_test_pred, zero_division=0)
+            }
         return metrics
 
     def predict(self, X):
-        if self.model is None:
+        if self.model is None and self.compiled is None:
             raise ValueError("Modelo não treinado")
-        X = X.copy()
-        # Apply same encoding as training
-        for col, encoder in self.encoders.items():
-            if col in X.columns:
-                X[col] = encoder.transform(X[col].astype(str))
-        predictions = self.model.predict(X)
+        # Same encoding as training; extra columns (e.g. the target) are ignored
+        with fase('encode'):
+            X = self.preprocessor.transform(X)
+        with fase('predict'):
+            predictions = self._predict_encoded(X)
         # Decode predictions back to original labels
         if self.label_encoder:
             predictions = self.label_encoder.inverse_transform(predictions)
         return predictions
 
+    def predict_records(self, records):
+        # Lista de dicts -> predições sem construir DataFrame (usado pelo coletor de micro-lotes)
+        if self.model is None and self.compiled is None:
+            raise ValueError("Modelo não treinado")
+        with fase('encode'):
+            X = self.preprocessor.transform_records(records)
+        with fase('predict'):
+            predictions = self._predict_encoded(X)
+        if self.label_encoder:
+            predictions = self.label_encoder.classes_[predictions]
+        return predictions
+
     def get_feature_importance(self):
-        if self.model is None:
+        if self.model is None and self.compiled is None:
             raise ValueError("Modelo não treinado")
         
-        if hasattr(self.model, 'feature_importances_'):
-            importances = self.model.feature_importances_
-            feature_names = self.feature_names or [f'Feature {i}' for i in range(len(importances))]
+        importances = getattr(self.model, 'feature_importances_', None)
+        if importances is None and self.compiled is not None:
+            importances = self.compiled.feature_importances
+        if importances is not None:
+            feature_names = self.preprocessor.output_names if self.preprocessor else self.feature_names
+            feature_names = feature_names or [f'Feature {i}' for i in range(len(importances))]
             importance_df = pd.DataFrame({
                 'feature': feature_names,
                 'importance': importances
@@ -135,21 +553,27 @@ class GerenciadorModelosML:
             return importance_df
         return None
 
-    def save_model(self, filepath):
-        if self.model is None:
+    def save_model(self, filepath, compiled_only=False):
+        if self.model is None and self.compiled is None:
             raise ValueError("Modelo não treinado")
+        if compiled_only and self.compiled is None:
+            raise ValueError("Só modelos de árvore podem ser salvos apenas na forma compilada")
         joblib.dump({
-            'model': self.model,
+            # compiled_only: o arquivo leva só os arrays das árvores, bem menor que o estimador do sklearn
+            'model': None if compiled_only else self.model,
+            'compiled': self.compiled,
             'model_name': self.model_name,
             'feature_names': self.feature_names,
-            'encoders': self.encoders,
+            'preprocessor': self.preprocessor,
             'label_encoder': self.label_encoder
         }, filepath)
 
-    def load_model(self, filepath):
-        model_data = joblib.load(filepath)
+    def load_model(self, filepath, mmap_mode=None):
+        # mmap_mode='r' mapeia os arrays grandes (ex.: nós das árvores) direto do disco, compartilhados entre processos
+        model_data = joblib.load(filepath, mmap_mode=mmap_mode)
         self.model = model_data['model']
+        self.compiled = model_data.get('compiled')
         self.model_name = model_data['model_name']
         self.feature_names = model_data.get('feature_names')
-        self.encoders = model_data.get('encoders', {})
+        self.preprocessor = model_data.get('preprocessor')
         self.label_encoder = model_data.get('label_encoder')
@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+
+class PerfilIncremental:
+    # Agregações que saem direto dos momentos acumulados, sem reler o histórico
+    AGGREGATES = ('count', 'null_count', 'sum', 'mean', 'std', 'var', 'min', 'max', 'skew')
+
+    def __init__(self, sample_size=10000, hll_precision=12, random_state=42, bins=None, max_categories=None):
+        # sample_size=None desliga a amostra; bins e max_categories ligam histogramas e contagens de valores
+        self.sample_size = sample_size
+        self.hll_precision = hll_precision
+        self.bins = bins
+        self.max_categories = max_categories
+        self.n_rows = 0
+        self.n_chunks = 0
+        self.columns = []
+        self.dtypes = {}
+        self.null_counts = {}
+        self.moments = {}
+        self.registers = {}
+        self.histograms = {}
+        self.value_counts = {}
+        self.sample = None
+        self._sample_keys = None
+        self._rng = np.random.default_rng(random_state)
+
+    def update(self, chunk):
+        for col in chunk.columns:
+            if col not in self.null_counts:
+                if col not in self.columns:
+                    self.columns.append(col)
+                self.null_counts[col] = 0
+                self.registers[col] = np.zeros(1 << self.hll_precision, dtype=np.uint8)
+            self._merge_dtype(col, chunk[col].dtype)
+
+        nulls = chunk.isnull().sum()
+        for col, count in nulls.items():
+            self.null_counts[col] += int(count)
+
+        numeric_cols = [col for col in chunk.columns if self._is_numeric(col)]
+        if numeric_cols:
+            self._update_moments(chunk, numeric_cols)
+
+        for col in chunk.columns:
+            self._update_sketch(col, chunk[col])
+            if self.bins and self._is_numeric(col):
+                self._update_histogram(col, chunk[col])
+            elif self.max_categories and not self._is_numeric(col):
+                self._update_value_counts(col, chunk[col])
+
+        if self.sample_size:
+            self._update_sample(chunk)
+        self.n_rows += len(chunk)
+        self.n_chunks += 1
+
+    def _is_numeric(self, col):
+        dtype = self.dtypes.get(col)
+        return dtype is not None and is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+    def _merge_dtype(self, col, dtype):
+        current = self.dtypes.get(col)
+        if current is None or current == dtype:
+            self.dtypes[col] = dtype
+        elif is_numeric_dtype(current) and is_numeric_dtype(dtype):
+            self.dtypes[col] = np.dtype('float64')
+        else:
+            # Coluna deixou de ser numérica em algum bloco: descarta os momentos
+            self.dtypes[col] = np.dtype('object')
+            self.moments.pop(col, None)
+            self.histograms.pop(col, None)
+
+    def _update_moments(self, chunk, numeric_cols):
+        block = chunk[numeric_cols].to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(block)
+        n_b = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sum_b = np.where(valid, block, 0.0).sum(axis=0)
+            mean_b = np.where(n_b > 0, sum_b / np.maximum(n_b, 1), 0.0)
+            centered = np.where(valid, block - mean_b, 0.0)
+            m2_b = (centered ** 2).sum(axis=0)
+            m3_b = (centered ** 3).sum(axis=0)
+            min_b = np.where(valid, block, np.inf).min(axis=0)
+            max_b = np.where(valid, block, -np.inf).max(axis=0)
+
+        for i, col in enumerate(numeric_cols):
+            n = int(n_b[i])
+            if n == 0:
+                self.moments.setdefault(col, {'count': 0, 'mean': 0.0, 'm2': 0.0, 'm3': 0.0,
+                                              'min': np.inf, 'max': -np.inf})
+                continue
+            stats = self.moments.get(col)
+            if stats is None or stats['count'] == 0:
+                self.moments[col] = {'count': n, 'mean': float(mean_b[i]), 'm2': float(m2_b[i]),
+                                     'm3': float(m3_b[i]), 'min': float(min_b[i]), 'max': float(max_b[i])}
+                continue
+            # Combinação de Welford/Chan entre o acumulado e o bloco atual
+            n_a = stats['count']
+            total = n_a + n
+            delta = mean_b[i] - stats['mean']
+            stats['m3'] += (m3_b[i] + delta ** 3 * n_a * n * (n_a - n) / total ** 2
+                            + 3 * delta * (n_a * m2_b[i] - n * stats['m2']) / total)
+            stats['mean'] += delta * n / total
+            stats['m2'] += m2_b[i] + delta ** 2 * n_a * n / total
+            stats['count'] = total
+            stats['min'] = min(stats['min'], float(min_b[i]))
+            stats['max'] = max(stats['max'], float(max_b[i]))
+
+    def _update_histogram(self, col, series):
+        # Bins de largura fixa: o intervalo cresce com bins novos e, se passar de 2x bins, pares são fundidos
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        hist = self.histograms.get(col)
+        if hist is None:
+            width = (high - low) / self.bins if high > low else 1.0
+            hist = self.histograms[col] = {'start': low, 'width': width, 'counts': np.zeros(self.bins, dtype=np.int64)}
+
+        counts = hist['counts']
+        while True:
+            left = int(np.ceil((hist['start'] - low) / hist['width'])) if low < hist['start'] else 0
+            right = max(int(np.ceil((high - hist['start']) / hist['width'])) - len(counts), 0)
+            if left + len(counts) + right <= 2 * self.bins:
+                break
+            if len(counts) % 2:
+                counts = np.append(counts, 0)
+            counts = counts.reshape(-1, 2).sum(axis=1)
+            hist['width'] *= 2
+        if left or right:
+            counts = np.concatenate([np.zeros(left, dtype=np.int64), counts, np.zeros(right, dtype=np.int64)])
+            hist['start'] -= left * hist['width']
+
+        index = np.floor((values - hist['start']) / hist['width']).astype(np.int64)
+        np.clip(index, 0, len(counts) - 1, out=index)
+        hist['counts'] = counts + np.bincount(index, minlength=len(counts))
+
+    def _update_value_counts(self, col, series):
+        if col in self.value_counts and self.value_counts[col] is None:
+            return
+        counts = series.value_counts(dropna=True)
+        if isinstance(counts.index, pd.CategoricalIndex):
+            counts = counts[counts > 0]
+            counts.index = counts.index.astype(object)
+        current = self.value_counts.get(col)
+        if current is not None:
+            counts = current.add(counts, fill_value=0).astype(np.int64)
+        # Cardinalidade alta demais: para de contar essa coluna
+        self.value_counts[col] = counts if len(counts) <= self.max_categories else None
+
+    def _update_sketch(self, col, series):
+        series = series.dropna()
+        if series.empty:
+            return
+        if self._is_numeric(col):
+            values = series.to_numpy(dtype='float64')
+        else:
+            values = series.astype(object).to_numpy()
+        hashes = pd.util.hash_array(values)
+
+        p = self.hll_precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << (64 - p)) - 1)
+        with np.errstate(divide='ignore'):
+            bit_length = np.where(suffix > 0, np.floor(np.log2(suffix.astype('float64'))) + 1, 0)
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers[col], index, rank)
+
+    def _update_sample(self, chunk):
+        # Amostragem bottom-k: cada linha recebe uma chave aleatória e ficam as k menores
+        keys = self._rng.random(len(chunk))
+        if self.sample is None:
+            candidates = chunk.reset_index(drop=True)
+            candidate_keys = keys
+        else:
+            candidates = pd.concat([self.sample, chunk], ignore_index=True)
+            candidate_keys = np.concatenate([self._sample_keys, keys])
+        if len(candidates) > self.sample_size:
+            keep = np.argpartition(candidate_keys, self.sample_size)[:self.sample_size]
+            keep.sort()
+            candidates = candidates.iloc[keep].reset_index(drop=True)
+            candidate_keys = candidate_keys[keep]
+        self.sample = candidates
+        self._sample_keys = candidate_keys
+
+    def approx_distinct(self, col):
+        registers = self.registers[col]
+        m = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype('float64')))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def numeric_statistics(self):
+        stats = {}
+        for col, moments in self.moments.items():
+            count = moments['count']
+            if count == 0:
+                stats[col] = {'count': 0, 'mean': None, 'variance': None, 'std': None, 'min': None, 'max': None}
+                continue
+            variance = moments['m2'] / (count - 1) if count > 1 else None
+            stats[col] = {
+                'count': count,
+                'mean': moments['mean'],
+                'variance': variance,
+                'std': float(np.sqrt(variance)) if variance is not None else None,
+                'min': moments['min'],
+                'max': moments['max']
+            }
+        return stats
+
+    def statistics(self, aggregates=AGGREGATES):
+        # Mesmo formato e estimadores de MotorEstatisticas.compute()
+        unknown = [agg for agg in aggregates if agg not in self.AGGREGATES]
+        if unknown:
+            raise ValueError(f"Agregações não incrementais: {', '.join(unknown)}")
+        results = {}
+        for col in self.columns:
+            moments = self.moments.get(col)
+            if moments is None:
+                continue
+            count = moments['count']
+            m2, m3 = moments['m2'], moments['m3']
+            variance = m2 / (count - 1) if count > 1 else None
+            skew = None
+            if count > 2:
+                skew = 0.0 if m2 == 0 else (np.sqrt(count * (count - 1)) / (count - 2)
+                                            * (m3 / count) / (m2 / count) ** 1.5)
+            values = {
+                'count': count,
+                'null_count': self.null_counts[col],
+                'sum': moments['mean'] * count if count else 0.0,
+                'mean': moments['mean'] if count else None,
+                'std': float(np.sqrt(variance)) if variance is not None else None,
+                'var': variance,
+                'min': moments['min'] if count else None,
+                'max': moments['max'] if count else None,
+                'skew': float(skew) if skew is not None else None
+            }
+            results[col] = {agg: values[agg] for agg in aggregates}
+        return results
+
+    def histogram(self, col):
+        hist = self.histograms.get(col)
+        if hist is None:
+            return None
+        counts = hist['counts']
+        used = np.flatnonzero(counts)
+        counts = counts[used[0]:used[-1] + 1] if len(used) else counts[:0]
+        start = hist['start'] + (used[0] if len(used) else 0) * hist['width']
+        return counts, start + hist['width'] * np.arange(len(counts) + 1)
+
+    def to_dict(self):
+        return {
+            'n_rows': self.n_rows,
+            'n_columns': len(self.columns),
+            'n_chunks': self.n_chunks,
+            'columns': list(self.columns),
+            'dtypes': {col: str(self.dtypes[col]) for col in self.columns},
+            'missing_values': dict(self.null_counts),
+            'statistics': self.numeric_statistics(),
+            'approx_distinct': {col: self.approx_distinct(col) for col in self.columns},
+            'sample_size': 0 if self.sample is None else len(self.sample)
+        }
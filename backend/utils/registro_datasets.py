@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import hashlib
+import threading
+
+
+class RegistroDatasets:
+    def __init__(self, max_datasets=8, max_bytes=2 * 1024**3):
+        self.max_datasets = max_datasets
+        self.max_bytes = max_bytes
+        self._datasets = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(file, block_size=1024 * 1024):
+        digest = hashlib.sha256()
+        file.seek(0)
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+        file.seek(0)
+        return digest.hexdigest()[:32]
+
+    def put(self, dataset_id, df, profile=None, size=None):
+        # size: tamanho já conhecido (ex.: append = original + bloco novo), evita medir o DataFrame inteiro
+        size = int(df.memory_usage(deep=True).sum()) if size is None else int(size)
+        with self._lock:
+            if dataset_id in self._datasets:
+                self._total_bytes -= self._datasets.pop(dataset_id)[1]
+            self._datasets[dataset_id] = (df, size, profile)
+            self._total_bytes += size
+            self._evict()
+        return dataset_id
+
+    def get(self, dataset_id):
+        with self._lock:
+            entry = self._datasets.get(dataset_id)
+            if entry is None:
+                return None
+            self._datasets.move_to_end(dataset_id)
+            return entry[0]
+
+    def profile(self, dataset_id):
+        # Perfil incremental mantido pelos appends; None para datasets nunca estendidos
+        with self._lock:
+            entry = self._datasets.get(dataset_id)
+            return entry[2] if entry is not None else None
+
+    def size(self, dataset_id):
+        with self._lock:
+            entry = self._datasets.get(dataset_id)
+            return entry[1] if entry is not None else None
+
+    def __contains__(self, dataset_id):
+        with self._lock:
+            return dataset_id in self._datasets
+
+    def remove(self, dataset_id):
+        with self._lock:
+            entry = self._datasets.pop(dataset_id, None)
+            if entry is not None:
+                self._total_bytes -= entry[1]
+            return entry is not None
+
+    def _evict(self):
+        # Mantém sempre o dataset mais recente, mesmo que sozinho exceda o limite
+        while len(self._datasets) > 1 and (
+            len(self._datasets) > self.max_datasets or self._total_bytes > self.max_bytes
+        ):
+            _, (_, size, _) = self._datasets.popitem(last=False)
+            self._total_bytes -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                'datasets': len(self._datasets),
+                'total_bytes': self._total_bytes,
+                'max_datasets': self.max_datasets,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+import threading
+import uuid
+
+
+class RegistroModelos:
+    def __init__(self, max_models=32):
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, gerenciador, model_id=None, metadata=None):
+        model_id = model_id or uuid.uuid4().hex[:16]
+        entry = {
+            'model': gerenciador,
+            'model_name': gerenciador.model_name,
+            'feature_names': gerenciador.feature_names,
+            'metadata': metadata or {},
+            'registered_at': datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self._models.pop(model_id, None)
+            self._models[model_id] = entry
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model_id
+
+    def get(self, model_id):
+        with self._lock:
+            entry = self._models.get(model_id)
+            if entry is None:
+                return None
+            self._models.move_to_end(model_id)
+            return entry['model']
+
+    def metadata(self, model_id):
+        with self._lock:
+            entry = self._models.get(model_id)
+            return None if entry is None else dict(entry['metadata'])
+
+    def latest(self, model_name=None):
+        with self._lock:
+            for model_id in reversed(self._models):
+                entry = self._models[model_id]
+                if model_name is None or entry['model_name'] == model_name:
+                    return model_id, entry['model']
+        return None, None
+
+    def remove(self, model_id):
+        with self._lock:
+            return self._models.pop(model_id, None) is not None
+
+    def list(self):
+        with self._lock:
+            return [
+                {k: v for k, v in entry.items() if k != 'model'} | {'model_id': model_id}
+                for model_id, entry in self._models.items()
+            ]
@@ -0,0 +1,153 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def valores_coluna(series, numpy_ok=False):
+    """Converte uma coluna em valores prontos para JSON, com nulos como None (ou NaN em arrays float)."""
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Converte só as categorias e indexa pelos códigos; o código -1 (nulo) cai no None do final
+        categories = valores_coluna(pd.Series(dtype.categories))
+        lookup = np.empty(len(categories) + 1, dtype=object)
+        lookup[:-1] = categories
+        lookup[-1] = None
+        return lookup[series.cat.codes.to_numpy()].tolist()
+
+    if isinstance(dtype, np.dtype) and dtype.kind in 'fiub':
+        values = series.to_numpy()
+        if dtype.kind == 'f' and dtype != np.float64:
+            # Mesmos dígitos do tolist(), para que 'records' e 'columns' escrevam valores idênticos
+            values = values.astype(np.float64)
+        if numpy_ok and orjson is not None:
+            return np.ascontiguousarray(values)
+        values = values.tolist()
+        if orjson is None and dtype.kind == 'f':
+            # O json da biblioteca padrão escreveria NaN, que não é JSON válido
+            values = [None if v != v else v for v in values]
+        return values
+
+    if dtype.kind == 'M':
+        return [None if pd.isna(v) else v.isoformat() for v in series]
+
+    numpy_dtype = getattr(dtype, 'numpy_dtype', None)
+    if numpy_dtype is not None and numpy_dtype.kind in 'iub' and not series.isna().any():
+        # Int64/boolean sem nulos: volta para o array numpy sem caixas
+        return valores_coluna(series.astype(numpy_dtype), numpy_ok)
+
+    values = series.to_numpy(dtype=object, na_value=None)
+    mask = pd.isna(values)
+    if mask.any():
+        values = values.copy()
+        values[mask] = None
+    return values.tolist()
+
+
+class QuadroJSON:
+    """Marca um DataFrame para ser serializado direto das colunas, sem astype(object)."""
+
+    ORIENTS = ('records', 'columns')
+
+    def __init__(self, df, orient='records'):
+        if orient not in self.ORIENTS:
+            raise ValueError(f"orient deve ser um de {self.ORIENTS}")
+        self.df = df
+        self.orient = orient
+
+    def to_python(self, numpy_ok=False):
+        df = self.df
+        columns = [valores_coluna(df.iloc[:, i], numpy_ok and self.orient == 'columns') for i in range(df.shape[1])]
+        if self.orient == 'columns':
+            return dict(zip(df.columns, columns))
+        names = df.columns.tolist()
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+class JSONPronto:
+    """JSON já serializado (ex.: figuras do plotly), embutido na resposta sem ser decodificado de novo."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def to_python(self):
+        return json.loads(self.data)
+
+
+def _default_python(obj):
+    if isinstance(obj, QuadroJSON):
+        return obj.to_python()
+    if isinstance(obj, JSONPronto):
+        return obj.to_python()
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f':
+            return np.where(np.isnan(obj), None, obj.astype(np.float64)).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def _default_orjson(obj):
+    if isinstance(obj, QuadroJSON):
+        return obj.to_python(numpy_ok=True)
+    if isinstance(obj, JSONPronto) and hasattr(orjson, 'Fragment'):
+        # orjson >= 3.9 copia os bytes como estão
+        return orjson.Fragment(obj.data)
+    return _default_python(obj)
+
+
+class ProvedorJSONRapido(DefaultJSONProvider):
+    """Provedor JSON do Flask que usa orjson quando disponível e cai no json padrão caso contrário."""
+
+    default = staticmethod(_default_python)
+
+    def _pretty(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _options(self, pretty=False):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, pretty=False):
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=_default_orjson, option=self._options(pretty))
+            except orjson.JSONEncodeError:
+                # Ex.: inteiros acima de 64 bits; o json padrão ainda consegue
+                pass
+        kwargs = {'indent': 2} if pretty else {}
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # Literais como NaN/Infinity só o json padrão aceita
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self.dumps_bytes(obj, pretty=self._pretty()) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
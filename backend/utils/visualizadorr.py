@@ -1,21 +1,110 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
+import base64
 import pandas as pd
 import numpy as np
 from pandas.api.types import is_numeric_dtype
+from .importacao_tardia import ModuloTardio
+from .correlacoes import MotorCorrelacoes
+from .serializacao_json import JSONPronto
+
+# plotly só é importado na primeira figura gerada
+px = ModuloTardio('plotly.express')
+go = ModuloTardio('plotly.graph_objects')
+plotly_json = ModuloTardio('plotly.io.json')
 
 class VisualizadorDados:
-    def __init__(self, data):
+    # Tipos aceitos pelos typed arrays do plotly.js (>= 2.28)
+    BINARY_DTYPES = {
+        'float64': 'f8', 'float32': 'f4',
+        'int32': 'i4', 'int16': 'i2', 'int8': 'i1',
+        'uint32': 'u4', 'uint16': 'u2', 'uint8': 'u1'
+    }
+
+    def __init__(self, data, aggregate='auto', max_points=50_000, bins=30, density_bins=100, profile=None):
         self.data = data
-        sns.set_style("whitegrid")
+        # Perfil incremental (datasets estendidos por append): histogramas e contagens já prontos
+        self.profile = profile
+        self.aggregate = aggregate
+        self.max_points = max_points
+        self.bins = bins
+        self.density_bins = density_bins
+
+    def _should_aggregate(self):
+        if self.aggregate == 'auto':
+            return len(self.data) > self.max_points
+        return self.aggregate is True
+
+    def _numeric_values(self, column):
+        return self.data[column].dropna().to_numpy(dtype='float64')
+
+    def _value_counts(self, column):
+        counts = self.profile.value_counts.get(column) if self.profile is not None else None
+        if counts is not None:
+            return counts.sort_values(ascending=False, kind='stable')
+        return self.data[column].value_counts()
+
+    @staticmethod
+    def _histogram_figure(column, counts, edges):
+        fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                               name=column, hovertemplate=f'{column}=%{{x}}<br>count=%{{y}}<extra></extra>'))
+        fig.update_layout(title=f'Distribuição de {column}', bargap=0,
+                          xaxis_title=column, yaxis_title='count')
+        return fig
+
+    @classmethod
+    def figure_to_payload(cls, fig, chart_format='json', binary=False, min_binary_length=64):
+        if chart_format == 'html':
+            return fig.to_html(full_html=False, include_plotlyjs='cdn')
+        if chart_format != 'json':
+            raise ValueError(f"Formato de gráfico '{chart_format}' não suportado")
+        
+        figure = fig.to_plotly_json()
+        if binary:
+            figure = cls._encode_arrays(figure, min_binary_length)
+        # O JSON do plotly vai direto para a resposta, sem json.loads e nova serialização
+        return JSONPronto(plotly_json.to_json_plotly(figure))
+
+    @classmethod
+    def _encode_arrays(cls, value, min_length):
+        if isinstance(value, dict):
+            return {k: cls._encode_arrays(v, min_length) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._encode_arrays(v, min_length) for v in value]
+        if not isinstance(value, np.ndarray) or value.size < min_length or value.ndim > 2:
+            return value
+        
+        array = value
+        if array.dtype.kind in 'iu' and array.dtype.itemsize == 8:
+            # plotly.js não tem int64: usa int32 quando cabe, senão float64
+            info = np.iinfo(np.int32)
+            if array.min() >= info.min and array.max() <= info.max:
+                array = array.astype(np.int32)
+            else:
+                array = array.astype(np.float64)
+        elif array.dtype == np.bool_:
+            array = array.astype(np.uint8)
+        
+        dtype = cls.BINARY_DTYPES.get(array.dtype.name)
+        if dtype is None:
+            return value
+        
+        encoded = {
+            'dtype': dtype,
+            'bdata': base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+        }
+        if array.ndim == 2:
+            encoded['shape'] = f'{array.shape[0]},{array.shape[1]}'
+        return encoded
 
     def plot_distribution(self, column, plot_type='histogram'):
         if column not in self.data.columns:
             raise ValueError(f"Coluna '{column}' não encontrada")
 
-        if is_numeric_dtype(self.data[column]):
+        histogram = self.profile.histogram(column) if self.profile is not None and plot_type == 'histogram' else None
+        if histogram is not None:
+            fig = self._histogram_figure(column, *histogram)
+        elif is_numeric_dtype(self.data[column]) and self._should_aggregate():
+            fig = self._plot_distribution_aggregated(column, plot_type)
+        elif is_numeric_dtype(self.data[column]):
             if plot_type == 'histogram':
                 fig = px.histogram(self.data, x=column, title=f'Distribuição de {column}', nbins=30)
             elif plot_type == 'box':
@@ -23,21 +112,91 @@ class VisualizadorDados:
             elif plot_type == 'violin':
                 fig = px.violin(self.data, y=column, title=f'Violin Plot de {column}')
         else:
-            value_counts = self.data[column].value_counts()
+            value_counts = self._value_counts(column)
             fig = px.bar(x=value_counts.index, y=value_counts.values, 
                         title=f'Distribuição de {column}', labels={'x': column, 'y': 'Frequência'})
         
         fig.update_layout(template='plotly_white', height=500)
         return fig
 
-    def plot_correlation_heatmap(self):
-        numeric_data = self.data.select_dtypes(include='number')
-        if numeric_data.shape[1] < 2:
+    def _plot_distribution_aggregated(self, column, plot_type):
+        values = self._numeric_values(column)
+        if plot_type == 'histogram':
+            counts, edges = np.histogram(values, bins=self.bins)
+            return self._histogram_figure(column, counts, edges)
+
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75]) if len(values) else (np.nan,) * 3
+        iqr = q3 - q1
+        # Cercas como no plotly: último ponto dentro de 1.5 * IQR
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        lowerfence = inside.min() if len(inside) else q1
+        upperfence = inside.max() if len(inside) else q3
+
+        if plot_type == 'box':
+            fig = go.Figure(go.Box(q1=[q1], median=[median], q3=[q3], lowerfence=[lowerfence],
+                                   upperfence=[upperfence], mean=[values.mean() if len(values) else np.nan],
+                                   name=column))
+            fig.update_layout(title=f'Box Plot de {column}', yaxis_title=column)
+            return fig
+
+        if plot_type == 'violin':
+            density, edges = np.histogram(values, bins=self.density_bins, density=True)
+            centers = (edges[:-1] + edges[1:]) / 2
+            width = density / density.max() * 0.4 if density.max() > 0 else density
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=np.concatenate([-width, width[::-1]]),
+                                     y=np.concatenate([centers, centers[::-1]]),
+                                     fill='toself', mode='lines', name=column, hoverinfo='skip'))
+            fig.add_trace(go.Box(q1=[q1], median=[median], q3=[q3], lowerfence=[lowerfence],
+                                 upperfence=[upperfence], x=[0], width=0.1, name='quartis',
+                                 fillcolor='white', line=dict(color='black')))
+            fig.update_layout(title=f'Violin Plot de {column}', yaxis_title=column, showlegend=False,
+                              xaxis=dict(showticklabels=False, zeroline=False))
+            return fig
+
+        raise ValueError(f"Tipo de gráfico '{plot_type}' não suportado")
+
+    @staticmethod
+    def plot_confusion_matrix(cm):
+        fig = px.imshow(cm, 
+                        text_auto=True,
+                        labels=dict(x="Predito", y="Real", color="Quantidade"),
+                        title="Matriz de Confusão",
+                        color_continuous_scale='Blues')
+        fig.update_layout(template='plotly_white', height=500)
+        return fig
+
+    @staticmethod
+    def plot_feature_importance(importance_df, top_n=15):
+        fig = px.bar(importance_df.head(top_n), 
+                     x='importance', 
+                     y='feature',
+                     orientation='h',
+                     title=f'Top {top_n} - Importância das Features',
+                     labels={'importance': 'Importância', 'feature': 'Feature'})
+        fig.update_layout(template='plotly_white', height=500)
+        return fig
+
+    def plot_correlation_heatmap(self, method='pearson', max_columns=30, correlation=None, max_text_columns=20):
+        # correlation: (colunas, matriz) já calculados, ex.: vindos do cache por dataset
+        if correlation is None:
+            motor = MotorCorrelacoes(method)
+            columns = motor.numeric_columns(self.data)
+            if len(columns) < 2:
+                raise ValueError("Não há colunas numéricas suficientes para correlação")
+            correlation = (columns, motor.matrix(self.data, columns))
+        columns, corr_matrix = correlation
+        if len(columns) < 2:
             raise ValueError("Não há colunas numéricas suficientes para correlação")
         
-        corr_matrix = numeric_data.corr()
-        fig = px.imshow(corr_matrix, text_auto='.2f', title='Matriz de Correlação',
-                       color_continuous_scale='RdBu_r', aspect='auto')
+        # Com muitas colunas, mostra só as mais correlacionadas, agrupadas por similaridade
+        shown, corr_matrix = MotorCorrelacoes.clustered_subset(corr_matrix, columns, max_columns)
+        title = 'Matriz de Correlação'
+        if len(shown) < len(columns):
+            title += f' ({len(shown)} de {len(columns)} colunas)'
+        fig = px.imshow(corr_matrix, x=shown, y=shown, zmin=-1, zmax=1,
+                       text_auto='.2f' if len(shown) <= max_text_columns else False,
+                       title=title, color_continuous_scale='RdBu_r', aspect='auto')
         fig.update_layout(height=600, template='plotly_white')
         return fig
 
@@ -45,7 +204,7 @@ class VisualizadorDados:
         if column not in self.data.columns:
             raise ValueError(f"Coluna '{column}' não encontrada")
         
-        value_counts = self.data[column].value_counts().head(top_n)
+        value_counts = self._value_counts(column).head(top_n)
         fig = px.bar(x=value_counts.index, y=value_counts.values, title=f'Top {top_n} - {column}',
                     labels={'x': column, 'y': 'Frequência'}, text=value_counts.values)
         fig.update_traces(textposition='outside')
@@ -56,23 +215,55 @@ class VisualizadorDados:
         if column not in self.data.columns:
             raise ValueError(f"Coluna '{column}' não encontrada.")
         
-        value_counts = self.data[column].value_counts().head(top_n)
+        value_counts = self._value_counts(column).head(top_n)
         fig = px.pie(values=value_counts.values, names=value_counts.index, 
                     title=f'Distribuição de {column}', hole=0.3)
         fig.update_layout(template='plotly_white', height=500)
         return fig
 
-    def plot_scatter(self, x_column, y_column, color_column=None):
+    def plot_scatter(self, x_column, y_column, color_column=None, scatter_mode=None):
         if x_column not in self.data.columns or y_column not in self.data.columns:
             raise ValueError("Colunas não encontradas")
         
-        fig = px.scatter(self.data, x=x_column, y=y_column, color=color_column,
+        data = self.data
+        if self._should_aggregate():
+            scatter_mode = scatter_mode or ('sample' if color_column else 'density')
+            if scatter_mode == 'density':
+                return self._plot_scatter_density(x_column, y_column)
+            # Amostrar só faz sentido acima do limite; abaixo dele todos os pontos já cabem
+            if len(data) > self.max_points:
+                data = self._stratified_sample(color_column)
+        
+        fig = px.scatter(data, x=x_column, y=y_column, color=color_column,
                         title=f'{y_column} vs {x_column}', opacity=0.7)
         fig.update_layout(template='plotly_white', height=500)
         return fig
 
+    def _plot_scatter_density(self, x_column, y_column):
+        pairs = self.data[[x_column, y_column]].dropna().to_numpy(dtype='float64')
+        counts, x_edges, y_edges = np.histogram2d(pairs[:, 0], pairs[:, 1], bins=self.density_bins)
+        counts = np.where(counts > 0, counts, np.nan)
+        fig = go.Figure(go.Heatmap(z=counts.T, x=(x_edges[:-1] + x_edges[1:]) / 2,
+                                   y=(y_edges[:-1] + y_edges[1:]) / 2, colorscale='Viridis',
+                                   colorbar=dict(title='Pontos')))
+        fig.update_layout(title=f'{y_column} vs {x_column}', xaxis_title=x_column, yaxis_title=y_column,
+                          template='plotly_white', height=500)
+        return fig
+
+    def _stratified_sample(self, stratify_column=None, random_state=42):
+        if stratify_column is None:
+            return self.data.sample(n=self.max_points, random_state=random_state)
+        
+        # Amostra proporcional por grupo, garantindo ao menos um ponto de cada grupo
+        rng = np.random.default_rng(random_state)
+        shuffled = self.data.iloc[rng.permutation(len(self.data))]
+        groups = shuffled.groupby(stratify_column, observed=True, dropna=False)[stratify_column]
+        rank = groups.cumcount().to_numpy()
+        quota = np.maximum(1, np.round(groups.transform('size').to_numpy() * self.max_points / len(self.data)))
+        return shuffled[rank < quota]
+
     def plot_grouped_bar(self, category_col, value_col, group_col):
-        grouped_data = self.data.groupby([category_col, group_col])[value_col].mean().reset_index()
+        grouped_data = self.data.groupby([category_col, group_col], observed=True)[value_col].mean().reset_index()
         fig = px.bar(grouped_data, x=category_col, y=value_col, color=group_col, barmode='group',
                     title=f'{value_col} por {category_col} e {group_col}')
         fig.update_layout(template='plotly_white', height=500)
@@ -96,10 +287,10 @@ class VisualizadorDados:
             raise ValueError(f"Coluna '{location_column}' não encontrada")
         
         if value_column and value_column in self.data.columns:
-            map_data = self.data.groupby(location_column)[value_column].agg(['count', 'mean']).reset_index()
+            map_data = self.data.groupby(location_column, observed=True)[value_column].agg(['count', 'mean']).reset_index()
             map_data.columns = [location_column, 'count', 'avg_value']
         else:
-            map_data = self.data[location_column].value_counts().reset_index()
+            map_data = self._value_counts(location_column).reset_index()
             map_data.columns = [location_column, 'count']
         
         if map_type == 'choropleth':
@@ -0,0 +1,163 @@
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin
+from .importacao_tardia import ModuloTardio
+
+neighbors = ModuloTardio('sklearn.neighbors')
+distance = ModuloTardio('scipy.spatial.distance')
+
+
+class ClassificadorKNNIndexado(ClassifierMixin, BaseEstimator):
+    """KNN com o índice construído uma vez no fit.
+
+    index='exact' usa a árvore (kd/ball tree) do sklearn; index='ivf' usa listas invertidas: os pontos
+    são agrupados por k-means e cada consulta só mede a distância aos pontos das n_probe listas de
+    centróide mais próximo. Mais listas sondadas = recall maior e consulta mais lenta.
+    """
+
+    INDEXES = ('auto', 'exact', 'ivf')
+    METRICS = ('euclidean', 'manhattan', 'minkowski')
+
+    def __init__(self, n_neighbors=5, weights='uniform', metric='euclidean', index='auto', n_probe=16,
+                 n_lists=None, ivf_min_rows=20_000, batch_rows=2048, n_jobs=None, random_state=42):
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.metric = metric
+        self.index = index
+        self.n_probe = n_probe
+        self.n_lists = n_lists
+        self.ivf_min_rows = ivf_min_rows
+        self.batch_rows = batch_rows
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        if self.index not in self.INDEXES:
+            raise ValueError(f"Índice '{self.index}' não suportado")
+        if self.metric not in self.METRICS:
+            raise ValueError(f"Métrica '{self.metric}' não suportada")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        self.n_features_in_ = X.shape[1]
+
+        self.index_ = self.index
+        if self.index == 'auto':
+            # Abaixo de ivf_min_rows a árvore exata já é rápida o bastante
+            self.index_ = 'ivf' if len(X) >= self.ivf_min_rows else 'exact'
+        if self.index_ == 'exact':
+            self.exact_ = neighbors.KNeighborsClassifier(
+                n_neighbors=self.n_neighbors, weights=self.weights, metric=self.metric, n_jobs=self.n_jobs
+            ).fit(X, codes)
+            return self
+
+        self._build_ivf(X, codes)
+        return self
+
+    def _build_ivf(self, X, codes):
+        rng = np.random.default_rng(self.random_state)
+        n_lists = self.n_lists or int(np.clip(round(np.sqrt(len(X))), 1, 4096))
+        n_lists = min(n_lists, len(X))
+        # k-means (Lloyd) numa amostra: os centróides só definem as listas, não precisam ser exatos
+        sample = X[rng.choice(len(X), min(len(X), n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].astype(np.float64)
+        for _ in range(10):
+            assign = self._nearest_lists(sample, centroids.astype(np.float32), 1)[:, 0]
+            counts = np.bincount(assign, minlength=n_lists)
+            filled = counts > 0
+            for j in range(X.shape[1]):
+                sums = np.bincount(assign, weights=sample[:, j], minlength=n_lists)
+                centroids[filled, j] = sums[filled] / counts[filled]
+
+        self.centroids_ = centroids.astype(np.float32)
+        assign = self._nearest_lists(X, self.centroids_, 1)[:, 0]
+        order = np.argsort(assign, kind='stable')
+        # Pontos contíguos por lista: a lista l ocupa points_[offsets_[l]:offsets_[l + 1]]
+        self.points_ = X[order]
+        self.labels_ = codes[order]
+        self.offsets_ = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+        self.sq_norms_ = np.einsum('ij,ij->i', self.points_, self.points_)
+
+    def _nearest_lists(self, X, centroids, n_probe, empty=None):
+        sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+        out = np.empty((len(X), n_probe), dtype=np.int64)
+        for start in range(0, len(X), self.batch_rows):
+            block = X[start:start + self.batch_rows]
+            d = sq_norms - 2.0 * (block @ centroids.T)
+            if empty is not None:
+                # Listas vazias nunca são sondadas
+                d[:, empty] = np.inf
+            if n_probe < d.shape[1]:
+                d = np.argpartition(d, n_probe - 1, axis=1)[:, :n_probe]
+            else:
+                d = np.argsort(d, axis=1)
+            out[start:start + self.batch_rows] = d
+        return out
+
+    def _distances(self, Q, start, stop):
+        points = self.points_[start:stop]
+        if self.metric == 'manhattan':
+            return distance.cdist(Q, points, metric='cityblock')
+        # minkowski com p=2 (padrão do sklearn) é a euclidiana
+        d = (np.einsum('ij,ij->i', Q, Q)[:, None] + self.sq_norms_[start:stop]) - 2.0 * (Q @ points.T)
+        return np.sqrt(np.maximum(d, 0.0))
+
+    def _search(self, Q):
+        """Distâncias e posições (em points_) dos k vizinhos aproximados; -1 quando faltam candidatos."""
+        sizes = np.diff(self.offsets_)
+        n_probe = min(self.n_probe, int((sizes > 0).sum()))
+        k = min(self.n_neighbors, len(self.points_))
+        probes = self._nearest_lists(Q, self.centroids_, n_probe, empty=sizes == 0)
+
+        best_d = np.full((len(Q), k), np.inf, dtype=np.float32)
+        best_i = np.full((len(Q), k), -1, dtype=np.int64)
+        # Agrupa os pares (consulta, lista) por lista: cada lista vira um único produto de matrizes
+        pair_lists = probes.ravel()
+        pair_queries = np.repeat(np.arange(len(Q)), n_probe)
+        order = np.argsort(pair_lists, kind='stable')
+        pair_lists, pair_queries = pair_lists[order], pair_queries[order]
+        lists, first = np.unique(pair_lists, return_index=True)
+        bounds = np.append(first, len(pair_lists))
+        for lst, a, b in zip(lists, bounds[:-1], bounds[1:]):
+            queries = pair_queries[a:b]
+            start, stop = self.offsets_[lst], self.offsets_[lst + 1]
+            cand_d = np.concatenate([best_d[queries], self._distances(Q[queries], start, stop)], axis=1)
+            cand_i = np.concatenate([best_i[queries], np.broadcast_to(np.arange(start, stop), (len(queries), stop - start))], axis=1)
+            keep = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            best_d[queries] = np.take_along_axis(cand_d, keep, axis=1)
+            best_i[queries] = np.take_along_axis(cand_i, keep, axis=1)
+        return best_d, best_i
+
+    def _proba_block(self, Q):
+        best_d, best_i = self._search(Q)
+        found = best_i >= 0
+        if self.weights == 'distance':
+            with np.errstate(divide='ignore'):
+                weight = 1.0 / best_d
+            # Como no sklearn: vizinhos a distância zero levam todo o peso
+            exact = (best_d == 0) & found
+            has_exact = exact.any(axis=1)
+            weight[has_exact] = exact[has_exact]
+        else:
+            weight = np.ones(best_d.shape)
+        weight = np.where(found, weight, 0.0)
+
+        n_classes = len(self.classes_)
+        rows = np.repeat(np.arange(len(Q)), best_i.shape[1])
+        labels = self.labels_[np.where(found, best_i, 0)].ravel()
+        proba = np.bincount(rows * n_classes + labels, weights=weight.ravel(), minlength=len(Q) * n_classes)
+        proba = proba.reshape(len(Q), n_classes)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.index_ == 'exact':
+            return self.exact_.predict_proba(X)
+        # Consultas em lotes; os produtos de matrizes liberam o GIL, então threads bastam
+        blocks = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self._proba_block)(X[start:start + self.batch_rows])
+            for start in range(0, len(X), self.batch_rows)
+        )
+        return np.concatenate(blocks) if blocks else np.empty((0, len(self.classes_)))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -11,7 +11,7 @@ function Analysis({ data, showError }) {
       const response = await fetch('/api/analyze', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ data: data.data })
+        body: JSON.stringify({ dataset_id: data.dataset_id })
       });
 
       const result = await response.json();
@@ -43,6 +43,11 @@ function Analysis({ data, showError }) {
           </div>
 
           <h3>Estatísticas Descritivas</h3>
+          {analysis.sample_based?.length > 0 && (
+            <p>
+              Arquivo processado em blocos: {analysis.sample_based.join(', ')} estimado(s) em uma amostra de {analysis.sample_rows} linhas.
+            </p>
+          )}
           <div style={{ overflowX: 'auto' }}>
             <table>
               <thead>
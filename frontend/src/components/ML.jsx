@@ -1,4 +1,5 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState } from 'react';
+import Plot from 'react-plotly.js';
 import StatBox from './StatBox';
 
 function ML({ data, showMessage, showError }) {
@@ -7,50 +8,36 @@ function ML({ data, showMessage, showError }) {
   const [results, setResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [testSize, setTestSize] = useState(0.2);
-  const confusionRef = useRef(null);
-  const importanceRef = useRef(null);
-
-  useEffect(() => {
-    if (results) {
-      // Renderizar matriz de confusão
-      if (results.confusion_matrix_plot && confusionRef.current) {
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = results.confusion_matrix_plot;
-        confusionRef.current.innerHTML = '';
-        confusionRef.current.appendChild(tempDiv);
-        
-        const scripts = tempDiv.getElementsByTagName('script');
-        Array.from(scripts).forEach(script => {
-          const newScript = document.createElement('script');
-          newScript.text = script.text;
-          confusionRef.current.appendChild(newScript);
-        });
-      }
-      
-      // Renderizar importância de features
-      if (results.feature_importance_plot && importanceRef.current) {
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = results.feature_importance_plot;
-        importanceRef.current.innerHTML = '';
-        importanceRef.current.appendChild(tempDiv);
-        
-        const scripts = tempDiv.getElementsByTagName('script');
-        Array.from(scripts).forEach(script => {
-          const newScript = document.createElement('script');
-          newScript.text = script.text;
-          importanceRef.current.appendChild(newScript);
-        });
-      }
-    }
-  }, [results]);
+  const [progress, setProgress] = useState(0);
 
   const models = [
     { value: 'random_forest', label: 'Random Forest' },
     { value: 'decision_tree', label: 'Decision Tree' },
     { value: 'knn', label: 'K-Nearest Neighbors' },
-    { value: 'logistic_regression', label: 'Logistic Regression' }
+    { value: 'logistic_regression', label: 'Logistic Regression' },
+    { value: 'sgd_logistic_regression', label: 'SGD Logistic Regression' },
+    { value: 'naive_bayes', label: 'Naive Bayes' }
   ];
 
+  const waitForJob = async (jobId) => {
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, 1000));
+      const response = await fetch(`/api/jobs/${jobId}`);
+      const job = await response.json();
+
+      if (!response.ok) {
+        throw new Error(job.error || 'Erro no treinamento');
+      }
+      setProgress(job.progress || 0);
+      if (job.status === 'done') {
+        return job.result;
+      }
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        throw new Error(job.error || 'Erro no treinamento');
+      }
+    }
+  };
+
   const handleTrain = async () => {
     if (!targetCol) {
       showError('Selecione a coluna alvo');
@@ -58,28 +45,30 @@ function ML({ data, showMessage, showError }) {
     }
 
     setLoading(true);
+    setProgress(0);
     try {
       const response = await fetch('/api/train', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
-          data: data.data,
+          dataset_id: data.dataset_id,
           model_type: model,
           target_column: targetCol,
-          test_size: testSize
+          test_size: testSize,
+          binary: true
         })
       });
 
       const result = await response.json();
 
       if (response.ok) {
-        setResults(result);
+        setResults(response.status === 202 ? await waitForJob(result.job_id) : result);
         showMessage('Modelo treinado com sucesso');
       } else {
         showError(result.error || 'Erro no treinamento');
       }
     } catch (err) {
-      showError('Erro ao conectar com o servidor');
+      showError(err.message || 'Erro ao conectar com o servidor');
     }
     setLoading(false);
   };
@@ -136,7 +125,7 @@ function ML({ data, showMessage, showError }) {
       </div>
 
       <button className="btn" onClick={handleTrain} disabled={loading}>
-        {loading ? 'Treinando...' : 'Treinar Modelo'}
+        {loading ? `Treinando... ${(progress * 100).toFixed(0)}%` : 'Treinar Modelo'}
       </button>
 
       {results && (
@@ -186,14 +175,24 @@ function ML({ data, showMessage, showError }) {
           {results.confusion_matrix_plot && (
             <div style={{ marginTop: '2rem' }}>
               <h3>Matriz de Confusão</h3>
-              <div ref={confusionRef}></div>
+              <Plot
+                data={results.confusion_matrix_plot.data}
+                layout={{ ...results.confusion_matrix_plot.layout, autosize: true }}
+                useResizeHandler
+                style={{ width: '100%' }}
+              />
             </div>
           )}
 
           {results.feature_importance_plot && (
             <div style={{ marginTop: '2rem' }}>
               <h3>Importância das Features</h3>
-              <div ref={importanceRef}></div>
+              <Plot
+                data={results.feature_importance_plot.data}
+                layout={{ ...results.feature_importance_plot.layout, autosize: true }}
+                useResizeHandler
+                style={{ width: '100%' }}
+              />
             </div>
           )}
 
@@ -1,74 +1,20 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState } from 'react';
+import Plot from 'react-plotly.js';
+
+function Chart({ figure }) {
+  return (
+    <Plot
+      data={figure.data}
+      layout={{ ...figure.layout, autosize: true }}
+      useResizeHandler
+      style={{ width: '100%' }}
+    />
+  );
+}
 
 function Visualizations({ data, showError }) {
   const [charts, setCharts] = useState(null);
   const [loading, setLoading] = useState(false);
-  const distRef = useRef(null);
-  const corrRef = useRef(null);
-  const pieRef = useRef(null);
-  const geoRef = useRef(null);
-
-  useEffect(() => {
-    if (charts) {
-      // Injetar e executar scripts do Plotly
-      if (charts.distribution && distRef.current) {
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = charts.distribution;
-        distRef.current.innerHTML = '';
-        distRef.current.appendChild(tempDiv);
-        
-        // Executar scripts
-        const scripts = tempDiv.getElementsByTagName('script');
-        Array.from(scripts).forEach(script => {
-          const newScript = document.createElement('script');
-          newScript.text = script.text;
-          distRef.current.appendChild(newScript);
-        });
-      }
-      
-      if (charts.correlation && corrRef.current) {
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = charts.correlation;
-        corrRef.current.innerHTML = '';
-        corrRef.current.appendChild(tempDiv);
-        
-        const scripts = tempDiv.getElementsByTagName('script');
-        Array.from(scripts).forEach(script => {
-          const newScript = document.createElement('script');
-          newScript.text = script.text;
-          corrRef.current.appendChild(newScript);
-        });
-      }
-      
-      if (charts.pie && pieRef.current) {
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = charts.pie;
-        pieRef.current.innerHTML = '';
-        pieRef.current.appendChild(tempDiv);
-        
-        const scripts = tempDiv.getElementsByTagName('script');
-        Array.from(scripts).forEach(script => {
-          const newScript = document.createElement('script');
-          newScript.text = script.text;
-          pieRef.current.appendChild(newScript);
-        });
-      }
-      
-      if (charts.geographic && geoRef.current) {
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = charts.geographic;
-        geoRef.current.innerHTML = '';
-        geoRef.current.appendChild(tempDiv);
-        
-        const scripts = tempDiv.getElementsByTagName('script');
-        Array.from(scripts).forEach(script => {
-          const newScript = document.createElement('script');
-          newScript.text = script.text;
-          geoRef.current.appendChild(newScript);
-        });
-      }
-    }
-  }, [charts]);
 
   const handleVisualize = async () => {
     setLoading(true);
@@ -76,7 +22,7 @@ function Visualizations({ data, showError }) {
       const response = await fetch('/api/visualize', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ data: data.data })
+        body: JSON.stringify({ dataset_id: data.dataset_id, binary: true })
       });
 
       const result = await response.json();
@@ -105,25 +51,25 @@ function Visualizations({ data, showError }) {
           {charts.distribution && (
             <div style={{ marginBottom: '2rem' }}>
               <h3>Distribuição de Valores</h3>
-              <div ref={distRef}></div>
+              <Chart figure={charts.distribution} />
             </div>
           )}
           {charts.pie && (
             <div style={{ marginBottom: '2rem' }}>
               <h3>Gráfico de Pizza</h3>
-              <div ref={pieRef}></div>
+              <Chart figure={charts.pie} />
             </div>
           )}
           {charts.correlation && (
             <div style={{ marginBottom: '2rem' }}>
               <h3>Matriz de Correlação</h3>
-              <div ref={corrRef}></div>
+              <Chart figure={charts.correlation} />
             </div>
           )}
           {charts.geographic && (
             <div style={{ marginBottom: '2rem' }}>
               <h3>Distribuição Geográfica</h3>
-              <div ref={geoRef}></div>
+              <Chart figure={charts.geographic} />
             </div>
           )}
         </div>